@@ -0,0 +1,105 @@
+"""
+In-process TTL cache for read query results
+"""
+import functools
+import hashlib
+import re
+import threading
+from datetime import date
+from typing import Any, Callable, FrozenSet, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+from app.config import settings
+
+# Tables a statement reads from or writes to
+_TABLE_PATTERN = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+`?(\w+)`?", re.IGNORECASE)
+
+MISS = object()
+
+def referenced_tables(query: str) -> FrozenSet[str]:
+    """Return the lower-cased table names referenced by a query"""
+    return frozenset(name.lower() for name in _TABLE_PATTERN.findall(query))
+
+class QueryCache:
+    """Thread-safe TTL cache keyed on the SQL text and its parameters"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(kind: str, query: str, params: Optional[Any] = None) -> bytes:
+        """Hash the result kind, query and parameters into a compact key"""
+        return hashlib.blake2b(f"{kind}\0{query}\0{params!r}".encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Any:
+        """Return the cached value or MISS"""
+        with self._lock:
+            entry = self._cache.get(key, MISS)
+        return entry if entry is MISS else entry[1]
+
+    def set(self, key: bytes, query: str, value: Any) -> None:
+        """Store a result tagged with the tables its query reads"""
+        with self._lock:
+            self._cache[key] = (referenced_tables(query), value)
+
+    def invalidate(self, query: str) -> None:
+        """Drop every cached result that reads a table written by query"""
+        tables = referenced_tables(query)
+        if not tables:
+            return
+        with self._lock:
+            stale = [key for key, (tags, _) in self._cache.items() if tags & tables]
+            for key in stale:
+                self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+query_cache = QueryCache(maxsize=settings.query_cache_maxsize, ttl=settings.query_cache_ttl)
+
+
+# Caches created by ttl_cached, with the tables their results depend on
+_ttl_caches: List[Tuple[FrozenSet[str], TTLCache, threading.Lock]] = []
+
+def _normalize(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, date) else value
+
+def ttl_cached(ttl: float, tables: Tuple[str, ...], maxsize: int = 128) -> Callable:
+    """Cache a read-only function's result per argument set for ttl seconds.
+
+    The function's queries should pass use_cache=False, or query_cache entries
+    beneath it would keep results alive past ttl.
+    """
+    def decorator(func: Callable) -> Callable:
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        lock = threading.Lock()
+        _ttl_caches.append((frozenset(tables), cache, lock))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (
+                tuple(_normalize(a) for a in args),
+                tuple(sorted((k, _normalize(v)) for k, v in kwargs.items())),
+            )
+            with lock:
+                value = cache.get(key, MISS)
+            if value is MISS:
+                value = func(*args, **kwargs)
+                with lock:
+                    cache[key] = value
+            return value
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+def invalidate_ttl_cached(query: str) -> None:
+    """Clear ttl_cached functions that read a table written by query"""
+    written = referenced_tables(query)
+    for tables, cache, lock in _ttl_caches:
+        if tables & written:
+            with lock:
+                cache.clear()
@@ -3,7 +3,7 @@ Configuration management for different environments
 """
 import os
 from typing import Optional
-from pydantic import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     # Database settings
@@ -14,6 +14,24 @@ class Settings(BaseSettings):
     mysql_port: int = 3306
     mysql_pool_size: int = 10
     mysql_max_overflow: int = 20
+    mysql_connect_timeout: int = 2
+    mysql_pool_timeout: float = 5.0
+    mysql_max_execution_time_ms: int = 3000
+    
+    # Circuit breaker for the synchronous pool
+    db_breaker_threshold: int = 5
+    db_breaker_reset_seconds: int = 30
+    
+    # Window for coalescing concurrent detail lookups into one query
+    loader_batch_window_ms: int = 10
+    
+    # Query cache settings
+    query_cache_ttl: int = 30
+    query_cache_maxsize: int = 4096
+    # Larger results are not cached, bounding the memory a single entry holds
+    query_cache_max_rows: int = 1000
+    # Precomputed report tables older than this are bypassed
+    report_view_max_age_seconds: int = 7200
     
     # API settings
     api_title: str = "Crystal API"
@@ -29,12 +47,12 @@ class Settings(BaseSettings):
     environment: str = "development"
     debug: bool = True
     
-    # CORS settings
+    # CORS settings; list the frontend origins explicitly in production
     cors_origins: list = ["*"]
+    # Seconds browsers may cache a preflight response
+    cors_max_age: int = 86400
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, extra="ignore")
 
 # Global settings instance
 settings = Settings()
@@ -0,0 +1,119 @@
+"""
+Async database layer backed by an aiomysql connection pool
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiomysql
+import pymysql
+from fastapi import Request
+
+from app.cache import MISS, query_cache
+from app.config import settings
+from app.database_v2 import db_breaker, execution_time_sql
+from app.exceptions import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+def _is_connection_error(e: pymysql.Error) -> bool:
+    """True for lost or refused connections (client error codes 2000-2999), not query errors"""
+    if isinstance(e, pymysql.InterfaceError):
+        return True
+    return isinstance(e, pymysql.OperationalError) and bool(e.args) and 2000 <= e.args[0] < 3000
+
+async def create_pool() -> aiomysql.Pool:
+    """Create the aiomysql pool; connections are opened on first use"""
+    try:
+        pool = await aiomysql.create_pool(
+            host=settings.mysql_host,
+            port=settings.mysql_port,
+            user=settings.mysql_user,
+            password=settings.mysql_password,
+            db=settings.mysql_database,
+            minsize=0,
+            maxsize=settings.mysql_pool_size,
+            autocommit=True,
+            charset='utf8mb4',
+            connect_timeout=settings.mysql_connect_timeout,
+            init_command=execution_time_sql(settings.mysql_max_execution_time_ms),
+        )
+        logger.info("Async database connection pool created successfully")
+        return pool
+    except Exception as e:
+        logger.error(f"Failed to create async connection pool: {e}")
+        raise DatabaseError(f"Database connection failed: {str(e)}")
+
+async def close_pool(pool: aiomysql.Pool) -> None:
+    """Close all pooled connections"""
+    pool.close()
+    await pool.wait_closed()
+
+@asynccontextmanager
+async def acquire(pool: aiomysql.Pool) -> AsyncIterator[aiomysql.Connection]:
+    """Check out a connection, waiting at most mysql_pool_timeout seconds for a free one.
+
+    Shares the synchronous pool's circuit breaker, since both talk to the same server.
+    """
+    db_breaker.check()
+    try:
+        conn = await asyncio.wait_for(pool.acquire(), settings.mysql_pool_timeout)
+    except (asyncio.TimeoutError, pymysql.Error) as e:
+        db_breaker.record_failure()
+        logger.error(f"Failed to get database connection: {e!r}")
+        raise DatabaseError(f"Database connection failed: {e!r}")
+    try:
+        yield conn
+        db_breaker.record_success()
+    finally:
+        pool.release(conn)
+
+async def get_conn(request: Request) -> AsyncIterator[aiomysql.Connection]:
+    """FastAPI dependency yielding a pooled connection for the request"""
+    async with acquire(request.app.state.pool) as conn:
+        yield conn
+
+async def execute_query(conn: aiomysql.Connection, query: str, params: Optional[tuple] = None, use_cache: bool = True) -> List[Dict[str, Any]]:
+    """Execute a SELECT query and return all results"""
+    key = query_cache.make_key("all", query, params) if use_cache else None
+    if key is not None:
+        cached = query_cache.get(key)
+        if cached is not MISS:
+            return list(cached)
+    
+    try:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(query, params or ())
+            results = await cursor.fetchall()
+            logger.debug(f"Query executed successfully, returned {len(results)} rows")
+            if key is not None and len(results) <= settings.query_cache_max_rows:
+                query_cache.set(key, query, results)
+            return list(results)
+    except pymysql.Error as e:
+        if _is_connection_error(e):
+            db_breaker.record_failure()
+        logger.error(f"Query execution failed: {query[:100]}... Error: {e}")
+        raise DatabaseError(f"Database operation failed: {str(e)}")
+
+async def execute_single_query(conn: aiomysql.Connection, query: str, params: Optional[tuple] = None, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """Execute a SELECT query and return single result"""
+    key = query_cache.make_key("one", query, params) if use_cache else None
+    if key is not None:
+        cached = query_cache.get(key)
+        if cached is not MISS:
+            return cached
+    
+    try:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(query, params or ())
+            result = await cursor.fetchone()
+            logger.debug("Single query executed successfully")
+            if key is not None:
+                query_cache.set(key, query, result)
+            return result
+    except pymysql.Error as e:
+        if _is_connection_error(e):
+            db_breaker.record_failure()
+        logger.error(f"Single query execution failed: {query[:100]}... Error: {e}")
+        raise DatabaseError(f"Database operation failed: {str(e)}")
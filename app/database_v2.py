@@ -2,124 +2,307 @@
 Improved database layer with connection pooling and better error handling
 """
 import mysql.connector
-from mysql.connector import pooling
-import os
+from mysql.connector import HAVE_CEXT, pooling
+from mysql.connector.errors import InterfaceError, OperationalError, PoolError
 import logging
-from contextlib import contextmanager
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from contextlib import contextmanager, suppress
+from typing import List, Dict, Any, FrozenSet, Iterator, Optional
 
+from app.cache import MISS, invalidate_ttl_cached, query_cache, ttl_cached
 from app.config import settings
-from app.exceptions import DatabaseError
+from app.exceptions import DatabaseError, ServiceUnavailableError
 
 logger = logging.getLogger(__name__)
 
+def execution_time_sql(ms: int) -> str:
+    """SET statement capping SELECT run time; servers before 5.7.8 only set the dummy variable"""
+    return f"SET /*!50708 SESSION max_execution_time={ms}, */ @erp_session = 1"
+
+# Errors that mean the server or connection is unhealthy, as opposed to a bad query
+CONNECTION_ERRORS = (InterfaceError, OperationalError, PoolError)
+
 # Connection pool configuration
 pool_config = {
     'pool_name': 'wholesale_pool',
     'pool_size': settings.mysql_pool_size,
-    'pool_reset_session': True,
+    # Sessions keep their settings between checkouts; autocommit leaves no
+    # open transaction behind, and init_command only runs on (re)connect
+    'pool_reset_session': False,
     'host': settings.mysql_host,
     'port': settings.mysql_port,
     'user': settings.mysql_user,
     'password': settings.mysql_password,
     'database': settings.mysql_database,
     'autocommit': True,
+    'connect_timeout': settings.mysql_connect_timeout,
+    # Cap SELECTs server-side so a runaway query cannot hold a pool slot
+    'init_command': execution_time_sql(settings.mysql_max_execution_time_ms),
+    # Drain unread rows when an unbuffered cursor is closed early
+    'consume_results': True,
     'charset': 'utf8mb4',
     'collation': 'utf8mb4_unicode_ci'
 }
 
+# mysql-connector uses its libmysqlclient-backed C extension whenever it is
+# installed; the pure-Python protocol is several times slower per row
+if not HAVE_CEXT:
+    logger.warning("mysql-connector C extension unavailable, falling back to the pure-Python protocol")
+
+class CircuitBreaker:
+    """Fail fast after repeated database errors instead of queueing on a sick server"""
+    
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def check(self) -> None:
+        """Raise ServiceUnavailableError while open; after reset_seconds one trial call goes through"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                raise ServiceUnavailableError("Database unavailable, try again shortly")
+            # Half-open: let this caller probe, keep others out until it reports back
+            self._opened_at = time.monotonic()
+    
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.threshold:
+                if self._opened_at is None:
+                    logger.error(f"Database circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+db_breaker = CircuitBreaker(settings.db_breaker_threshold, settings.db_breaker_reset_seconds)
+
+# Prepared statements kept open per physical connection
+MAX_PREPARED_PER_CONNECTION = 64
+
 # Global connection pool
 _connection_pool: Optional[pooling.MySQLConnectionPool] = None
+_pool_lock = threading.Lock()
 
 def get_connection_pool() -> pooling.MySQLConnectionPool:
     """Get or create connection pool"""
     global _connection_pool
     
-    if _connection_pool is None:
-        try:
-            _connection_pool = pooling.MySQLConnectionPool(**pool_config)
-            logger.info("Database connection pool created successfully")
-        except Exception as e:
-            logger.error(f"Failed to create connection pool: {e}")
-            raise DatabaseError(f"Database connection failed: {str(e)}")
+    pool = _connection_pool
+    if pool is not None:
+        return pool
     
-    return _connection_pool
+    # Threadpool workers may race here before startup has warmed the pool
+    with _pool_lock:
+        if _connection_pool is None:
+            try:
+                _connection_pool = pooling.MySQLConnectionPool(**pool_config)
+                logger.info(
+                    "Database connection pool created successfully (%s protocol)",
+                    "C extension" if HAVE_CEXT else "pure Python"
+                )
+            except Exception as e:
+                logger.error(f"Failed to create connection pool: {e}")
+                raise DatabaseError(f"Database connection failed: {str(e)}")
+        return _connection_pool
+
+def warm_connection_pool() -> bool:
+    """Create the pool, opening all pool_size connections, before serving traffic"""
+    try:
+        get_connection_pool()
+        return True
+    except DatabaseError as e:
+        logger.warning(f"Connection pool not warmed, will retry on first request: {e.detail}")
+        return False
 
 def get_db_connection():
-    """Get a connection from the pool"""
+    """Get a connection from the pool; close() hands it back to the pool.
+
+    mysql-connector fails immediately when every pooled connection is in use,
+    so wait up to mysql_pool_timeout seconds for one to be returned.
+    """
     try:
         pool = get_connection_pool()
-        return pool.get_connection()
+        deadline = time.monotonic() + settings.mysql_pool_timeout
+        delay = 0.001
+        while True:
+            try:
+                return pool.get_connection()
+            except PoolError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
     except Exception as e:
         logger.error(f"Failed to get database connection: {e}")
         raise DatabaseError(f"Database connection failed: {str(e)}")
 
+def _prepared_cursor(conn, statement: str):
+    """Return the prepared cursor cached for statement on this physical connection"""
+    # Pooling hands out wrappers; the statement handles live on the raw connection
+    raw = getattr(conn, '_cnx', conn)
+    # Statement handles die with the server session; a pool reconnect keeps the
+    # connection object but starts a session with a new id
+    session_id = getattr(raw, 'connection_id', None)
+    cached_id, cursors = raw.__dict__.get('_prepared_cursors', (None, None))
+    if cursors is None or cached_id != session_id:
+        cursors = {}
+        raw.__dict__['_prepared_cursors'] = (session_id, cursors)
+    cursor = cursors.get(statement)
+    if cursor is None:
+        if len(cursors) >= MAX_PREPARED_PER_CONNECTION:
+            cursors.pop(next(iter(cursors))).close()
+        cursor = cursors[statement] = raw.cursor(prepared=True, dictionary=True)
+    return cursor
+
+def _drop_prepared_cursors(conn) -> None:
+    """Forget cached statements, e.g. after an error that may have reset the session"""
+    raw = getattr(conn, '_cnx', conn)
+    raw.__dict__.pop('_prepared_cursors', None)
+
 @contextmanager
-def get_db_cursor():
-    """Context manager for database operations with better error handling"""
+def get_db_cursor(buffered: bool = False, statement: Optional[str] = None):
+    """Context manager for database operations; cursors stream rows unless buffered=True.
+
+    Passing statement yields a server-side prepared cursor for that SQL, reused
+    across checkouts of the same pooled connection.
+    """
     conn = None
     cursor = None
+    db_breaker.check()
     
     try:
         conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True, buffered=True)
-        yield cursor
+        if statement is None:
+            cursor = conn.cursor(dictionary=True, buffered=buffered)
+            yield cursor
+        else:
+            yield _prepared_cursor(conn, statement)
     except mysql.connector.Error as e:
         logger.error(f"Database error: {e}")
+        if isinstance(e, CONNECTION_ERRORS):
+            db_breaker.record_failure()
         if conn:
+            _drop_prepared_cursors(conn)
             conn.rollback()
         raise DatabaseError(f"Database operation failed: {str(e)}")
+    except DatabaseError:
+        db_breaker.record_failure()
+        raise
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         if conn:
             conn.rollback()
         raise DatabaseError(f"Unexpected database error: {str(e)}")
+    else:
+        db_breaker.record_success()
     finally:
         if cursor:
             cursor.close()
         if conn:
             conn.close()
 
-def execute_query(query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
+def execute_query(query: str, params: Optional[tuple] = None, use_cache: bool = True, prepared: bool = False) -> List[Dict[str, Any]]:
     """Execute a SELECT query and return all results"""
+    key = query_cache.make_key("all", query, params) if use_cache else None
+    if key is not None:
+        cached = query_cache.get(key)
+        if cached is not MISS:
+            return list(cached)
+    
     try:
-        with get_db_cursor() as cursor:
+        with get_db_cursor(statement=query if prepared else None) as cursor:
             cursor.execute(query, params or ())
             results = cursor.fetchall()
             logger.debug(f"Query executed successfully, returned {len(results)} rows")
-            return results
+            if key is not None and len(results) <= settings.query_cache_max_rows:
+                query_cache.set(key, query, results)
+            return list(results)
     except Exception as e:
         logger.error(f"Query execution failed: {query[:100]}... Error: {e}")
         raise
 
-def execute_single_query(query: str, params: Optional[tuple] = None) -> Optional[Dict[str, Any]]:
+def execute_single_query(query: str, params: Optional[tuple] = None, use_cache: bool = True, prepared: bool = False) -> Optional[Dict[str, Any]]:
     """Execute a SELECT query and return single result"""
+    key = query_cache.make_key("one", query, params) if use_cache else None
+    if key is not None:
+        cached = query_cache.get(key)
+        if cached is not MISS:
+            return cached
+    
     try:
-        with get_db_cursor() as cursor:
+        with get_db_cursor(buffered=True, statement=query if prepared else None) as cursor:
             cursor.execute(query, params or ())
-            result = cursor.fetchone()
+            # Prepared cursors are reused, so leave no unread rows behind
+            rows = cursor.fetchall() if prepared else [cursor.fetchone()]
+            result = rows[0] if rows else None
             logger.debug(f"Single query executed successfully")
+            if key is not None:
+                query_cache.set(key, query, result)
             return result
     except Exception as e:
         logger.error(f"Single query execution failed: {query[:100]}... Error: {e}")
         raise
 
+def execute_stream(query: str, params: Optional[tuple] = None, chunk: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+    """Execute a SELECT query and yield its rows in batches of up to chunk rows"""
+    try:
+        with get_db_cursor() as cursor:
+            # A stream's run time is bounded by its consumer, not the server,
+            # so lift the per-statement cap for this checkout only
+            cursor.execute(execution_time_sql(0))
+            try:
+                cursor.execute(query, params or ())
+                rows = cursor.fetchmany(chunk)
+                while rows:
+                    yield rows
+                    rows = cursor.fetchmany(chunk)
+            finally:
+                # A connection too broken to take this is reconnected, and so
+                # re-capped by init_command, on its next checkout
+                with suppress(mysql.connector.Error):
+                    cursor.execute(execution_time_sql(settings.mysql_max_execution_time_ms))
+    except Exception as e:
+        logger.error(f"Streaming query failed: {query[:100]}... Error: {e}")
+        raise
+
 def execute_write_query(query: str, params: Optional[tuple] = None) -> int:
     """Execute INSERT/UPDATE/DELETE query and return affected rows"""
     try:
-        with get_db_cursor() as cursor:
+        with get_db_cursor(buffered=True) as cursor:
             cursor.execute(query, params or ())
             affected_rows = cursor.rowcount
+            query_cache.invalidate(query)
+            invalidate_ttl_cached(query)
             logger.debug(f"Write query executed successfully, affected {affected_rows} rows")
             return affected_rows
     except Exception as e:
         logger.error(f"Write query execution failed: {query[:100]}... Error: {e}")
         raise
 
+@ttl_cached(ttl=300, tables=())
+def existing_tables(*names: str) -> FrozenSet[str]:
+    """Return which of names exist in the current schema, rechecked every few minutes"""
+    sql = f"""
+        SELECT table_name AS name
+        FROM information_schema.tables
+        WHERE table_schema = DATABASE()
+        AND table_name IN ({", ".join(["%s"] * len(names))})
+    """
+    return frozenset(row['name'] for row in execute_query(sql, names, use_cache=False))
+
 def test_connection() -> bool:
     """Test database connection"""
     try:
-        with get_db_cursor() as cursor:
+        with get_db_cursor(buffered=True) as cursor:
             cursor.execute("SELECT 1")
             result = cursor.fetchone()
             return result is not None
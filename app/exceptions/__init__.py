@@ -10,6 +10,13 @@ class DatabaseError(HTTPException):
             detail=detail
         )
 
+class ServiceUnavailableError(HTTPException):
+    def __init__(self, detail: str = "Service temporarily unavailable"):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail
+        )
+
 class NotFoundError(HTTPException):
     def __init__(self, detail: str = "Resource not found"):
         super().__init__(
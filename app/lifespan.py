@@ -0,0 +1,25 @@
+"""
+Application startup and shutdown
+"""
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database_async import create_pool, close_pool
+from app.database_v2 import warm_connection_pool
+from app.loaders import Loaders
+from app.selfcheck import check_query_indexes
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open database pools and loaders before serving traffic and close them on shutdown"""
+    if await run_in_threadpool(warm_connection_pool) and settings.debug:
+        await run_in_threadpool(check_query_indexes)
+    app.state.pool = await create_pool()
+    app.state.loaders = Loaders(app.state.pool)
+    try:
+        yield
+    finally:
+        await close_pool(app.state.pool)
@@ -0,0 +1,77 @@
+"""
+Batching loaders that coalesce concurrent detail lookups into one query
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import aiomysql
+
+from app.config import settings
+from app.database_async import acquire, execute_query
+from app.routers.orders import SALES_BY_IDS_SQL
+from app.routers.purchase_orders import PURCHASE_ORDERS_BY_IDS_SQL
+from app.routers.suppliers import SUPPLIERS_BY_IDS_SQL
+from app.routers.users import USERS_BY_IDS_SQL
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on ids per IN (...) list
+MAX_BATCH_SIZE = 500
+
+class BatchLoader:
+    """Collect ids requested within a short window and fetch them with one query"""
+
+    def __init__(self, pool: aiomysql.Pool, sql: str, window: float):
+        self.pool = pool
+        self.sql = sql
+        self.window = window
+        self._pending: Dict[int, List[asyncio.Future]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(self, key: int) -> Optional[Dict[str, Any]]:
+        """Return the row whose id is key, or None if it does not exist"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        if self._task is None:
+            self._task = loop.create_task(self._dispatch())
+        return await future
+
+    async def _dispatch(self) -> None:
+        await asyncio.sleep(self.window)
+        batch, self._pending = self._pending, {}
+        self._task = None
+        keys = list(batch)
+        for start in range(0, len(keys), MAX_BATCH_SIZE):
+            chunk = keys[start:start + MAX_BATCH_SIZE]
+            try:
+                rows = await self._fetch(chunk)
+            except Exception as e:
+                for key in chunk:
+                    for future in batch[key]:
+                        if not future.done():
+                            future.set_exception(e)
+                continue
+            by_id = {row['id']: row for row in rows}
+            for key in chunk:
+                for future in batch[key]:
+                    if not future.done():
+                        future.set_result(by_id.get(key))
+
+    async def _fetch(self, keys: List[int]) -> List[Dict[str, Any]]:
+        sql = self.sql.format(ids=", ".join(["%s"] * len(keys)))
+        async with acquire(self.pool) as conn:
+            rows = await execute_query(conn, sql, tuple(keys))
+        logger.debug(f"Batched {len(keys)} lookups into one query")
+        return rows
+
+class Loaders:
+    """Application-wide loaders, one per entity served by a detail route"""
+
+    def __init__(self, pool: aiomysql.Pool):
+        window = settings.loader_batch_window_ms / 1000
+        self.sales = BatchLoader(pool, SALES_BY_IDS_SQL, window)
+        self.users = BatchLoader(pool, USERS_BY_IDS_SQL, window)
+        self.suppliers = BatchLoader(pool, SUPPLIERS_BY_IDS_SQL, window)
+        self.purchase_orders = BatchLoader(pool, PURCHASE_ORDERS_BY_IDS_SQL, window)
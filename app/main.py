@@ -1,26 +1,33 @@
 """
-Main FastAPI application with improved structure
+Main FastAPI application (canonical entry point: app.main:app)
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
+from app.lifespan import lifespan
 from app.middleware import LoggingMiddleware, ErrorHandlingMiddleware
 from app.utils import setup_logging
 
 # Import routers
-from app.routers import users, orders, products, purchase_orders, suppliers, auth
+from app.routers import users, orders, purchase_orders, suppliers, auth
 from app.routers.reports import sales, customers, inventory
 
 # Setup logging
 setup_logging(level="INFO" if settings.environment == "production" else "DEBUG")
 
+# Interactive docs are served outside production only
+DOCS_ENABLED = settings.environment != "production"
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.api_title,
     description=settings.api_description,
     version=settings.api_version,
-    debug=settings.debug
+    debug=settings.debug,
+    docs_url="/docs" if DOCS_ENABLED else None,
+    redoc_url="/redoc" if DOCS_ENABLED else None,
+    lifespan=lifespan
 )
 
 # Add middleware
@@ -30,8 +37,9 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=settings.cors_max_age,
 )
 
 # Include routers with versioning
@@ -47,7 +55,6 @@ app.include_router(
 # Basic CRUD routes
 app.include_router(users.router, prefix=API_PREFIX, tags=["users"])
 app.include_router(orders.router, prefix=API_PREFIX, tags=["orders"])
-app.include_router(products.router, prefix=API_PREFIX, tags=["products"])
 app.include_router(purchase_orders.router, prefix=API_PREFIX, tags=["purchase_orders"])
 app.include_router(suppliers.router, prefix=API_PREFIX, tags=["suppliers"])
 
@@ -75,7 +82,7 @@ def root():
         "message": f"Welcome to {settings.api_title}",
         "version": settings.api_version,
         "environment": settings.environment,
-        "docs": "/docs",
+        "docs": "/docs" if DOCS_ENABLED else None,
         "health": "/health"
     }
 
@@ -89,11 +96,18 @@ def health_check():
     }
 
 if __name__ == '__main__':
+    import os
     import uvicorn
     uvicorn.run(
-        "app.main:app" if settings.environment == "production" else "app.main:app",
+        "app.main:app",
         host='0.0.0.0', 
         port=5000,
         reload=settings.debug,
+        # One worker per core outside development (reload is single-process)
+        workers=None if settings.debug else os.cpu_count(),
+        loop="uvloop",
+        http="httptools",
+        backlog=2048,
+        timeout_keep_alive=15,
         log_level="info" if settings.environment == "production" else "debug"
     )
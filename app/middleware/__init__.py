@@ -3,35 +3,43 @@ Custom middleware for the application
 """
 import time
 import logging
-from fastapi import Request, Response
+import uuid
+from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.config import settings
+from app.utils import ORJSONResponse
+
 logger = logging.getLogger(__name__)
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     """Log all requests and responses"""
     
+    # Probe and documentation paths are served without logging
+    SKIP_PATHS = ("/health", "/docs", "/redoc", "/openapi.json")
+    
     async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+        if request.url.path in self.SKIP_PATHS:
+            return await call_next(request)
         
-        # Log request
-        logger.info(f"Request: {request.method} {request.url}")
+        start = time.perf_counter_ns()
         
         # Process request
         response = await call_next(request)
         
-        # Calculate processing time
-        process_time = time.time() - start_time
-        
-        # Log response
+        # One record per request, formatted only if INFO is enabled
+        duration_us = (time.perf_counter_ns() - start) // 1000
         logger.info(
-            f"Response: {response.status_code} | "
-            f"Time: {process_time:.3f}s | "
-            f"Path: {request.url.path}"
+            "%s %s -> %d %dus",
+            request.method, request.url.path, response.status_code, duration_us
         )
         
-        # Add processing time to response headers
-        response.headers["X-Process-Time"] = str(process_time)
+        # Add processing time (seconds) to response headers
+        response.headers["X-Process-Time"] = f"{duration_us / 1e6:.3f}"
+        
+        # Let clients reuse successful reads for as long as the query cache does
+        if request.method == "GET" and response.status_code == 200:
+            response.headers.setdefault("Cache-Control", f"private, max-age={settings.query_cache_ttl}")
         
         return response
 
@@ -41,10 +49,12 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         try:
             return await call_next(request)
-        except Exception as e:
-            logger.error(f"Unhandled error: {str(e)}", exc_info=True)
-            return Response(
-                content=f'{{"error": "Internal server error"}}',
+        except Exception:
+            # Correlation id lets clients quote the failure when reporting it
+            error_id = uuid.uuid4().hex
+            logger.exception("Unhandled error %s on %s %s", error_id, request.method, request.url.path)
+            return ORJSONResponse(
+                {"error": "Internal server error", "error_id": error_id},
                 status_code=500,
-                media_type="application/json"
+                headers={"X-Error-ID": error_id}
             )
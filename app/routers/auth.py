@@ -1,10 +1,57 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 from pydantic import BaseModel
+import asyncio
 import hashlib
-from app.database import execute_single_query
+import hmac
+import logging
+from typing import Any, Dict, Optional
+from cachetools import TTLCache
+from app.database_async import acquire, execute_single_query
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Passwords up to this many bytes are hashed inline on the event loop
+INLINE_HASH_MAX_BYTES = 256
+
+def _md5_hex(password: bytes) -> str:
+    return hashlib.md5(password).hexdigest()
+
+async def _hash_password(password: str) -> str:
+    """MD5 a candidate password, offloading unusually long inputs"""
+    encoded = password.encode()
+    if len(encoded) <= INLINE_HASH_MAX_BYTES:
+        return _md5_hex(encoded)
+    return await asyncio.get_running_loop().run_in_executor(None, _md5_hex, encoded)
+
+# Short-lived user rows keyed on lower-cased email, absorbing login retry
+# storms. Only touched from the event loop, so no lock is needed.
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=10)
+
+USER_BY_EMAIL_SQL = """
+    SELECT id, username, email, password, active, loccode, type
+    FROM users
+    WHERE email = %s
+    ORDER BY active = '1' DESC
+    LIMIT 1
+"""
+
+async def _get_user_by_email(request: Request, email: str) -> Optional[Dict[str, Any]]:
+    """Fetch a user row by email, preferring an active account"""
+    key = email.lower()
+    if key in _user_cache:
+        return _user_cache[key]
+    # Only a cache miss takes a pool slot
+    async with acquire(request.app.state.pool) as conn:
+        user = await execute_single_query(conn, USER_BY_EMAIL_SQL, (email,), use_cache=False)
+    _user_cache[key] = user
+    return user
+
+def invalidate_user_cache(email: str) -> None:
+    """Forget a cached user row, e.g. after a password change"""
+    _user_cache.pop(email.lower(), None)
+
 class LoginRequest(BaseModel):
     email: str  # Changed from username to email to match PHP
     password: str
@@ -19,17 +66,14 @@ class LoginResponse(BaseModel):
     message: str
 
 @router.post("/login", response_model=LoginResponse)
-def login(login_data: LoginRequest):
+async def login(login_data: LoginRequest, request: Request):
     """Login using email/password with MD5 verification (matching PHP legacy system)"""
     
     try:
         # Get user from database using email (like PHP code)
-        user = execute_single_query(
-            "SELECT * FROM users WHERE email = %s AND active = '1'", 
-            (login_data.email,)
-        )
+        user = await _get_user_by_email(request, login_data.email)
         
-        if not user:
+        if not user or str(user['active']) != '1':
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail="Invalid Email Address!"
@@ -43,9 +87,9 @@ def login(login_data: LoginRequest):
             )
         
         # Verify password using MD5 (matching PHP: md5($password)==$row['password'])
-        hashed_input_password = hashlib.md5(login_data.password.encode()).hexdigest()
+        hashed_input_password = await _hash_password(login_data.password)
         
-        if hashed_input_password != user['password']:
+        if not hmac.compare_digest(hashed_input_password.encode(), (user['password'] or '').encode()):
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail="Invalid Password!"
@@ -65,21 +109,17 @@ def login(login_data: LoginRequest):
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
-    except Exception as e:
-        # Log the actual error for debugging
-        print(f"Login error: {e}")
+    except Exception:
+        logger.exception("Login error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Login system error"
         )
 
 @router.get("/debug/{email}")
-def debug_user(email: str):
+async def debug_user(email: str, request: Request):
     """Debug endpoint to check user data structure"""
-    user = execute_single_query(
-        "SELECT id, username, email, password, active, loccode, type FROM users WHERE email = %s LIMIT 1", 
-        (email,)
-    )
+    user = await _get_user_by_email(request, email)
     if user:
         return {
             "found": True,
@@ -1,12 +1,21 @@
-from fastapi import APIRouter
-from app.database import execute_query, execute_single_query
+from fastapi import APIRouter, Depends, Request
+from app.database_async import get_conn, execute_query
+from app.utils import ORJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Sales columns exposed by the API; avoids shipping every column of a wide table
+SALE_COLUMNS = (
+    "id, refno, customer_id, date, tyme, type, sale_total_cost, paid, balance, "
+    "due_date, currency_id, loccode"
+)
+SALES_LIST_SQL = f"SELECT {SALE_COLUMNS} FROM sales LIMIT 10"
+SALES_BY_IDS_SQL = f"SELECT {SALE_COLUMNS} FROM sales WHERE id IN ({{ids}})"
 
 @router.get("/sales")
-def get_sales():
-    return execute_query('SELECT * FROM sales LIMIT 10;')
+async def get_sales(conn=Depends(get_conn)):
+    return await execute_query(conn, SALES_LIST_SQL)
 
 @router.get("/sales/{sale_id}")
-def get_sale(sale_id: int):
-    return execute_single_query('SELECT * FROM sales WHERE id = %s;', (sale_id,))
+async def get_sale(sale_id: int, request: Request):
+    return await request.app.state.loaders.sales.load(sale_id)
@@ -1,12 +1,17 @@
-from fastapi import APIRouter
-from app.database import execute_query, execute_single_query
+from fastapi import APIRouter, Depends, Request
+from app.database_async import get_conn, execute_query
+from app.utils import ORJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# The po_items schema is not documented here; list columns once it is
+PURCHASE_ORDERS_LIST_SQL = "SELECT * FROM po_items LIMIT 10"
+PURCHASE_ORDERS_BY_IDS_SQL = "SELECT * FROM po_items WHERE id IN ({ids})"
 
 @router.get("/purchase-orders")
-def get_purchase_orders():
-    return execute_query('SELECT * FROM po_items LIMIT 10;')
+async def get_purchase_orders(conn=Depends(get_conn)):
+    return await execute_query(conn, PURCHASE_ORDERS_LIST_SQL)
 
 @router.get("/purchase-orders/{po_id}")
-def get_purchase_order(po_id: int):
-    return execute_single_query('SELECT * FROM po_items WHERE id = %s;', (po_id,))
+async def get_purchase_order(po_id: int, request: Request):
+    return await request.app.state.loaders.purchase_orders.load(po_id)
@@ -1,43 +1,51 @@
 from fastapi import APIRouter, HTTPException, status
 from app.schemas.reports import CustomerReportRequest, StandardResponse
 from app.services.customer_service import CustomerReportService
+from app.utils import ORJSONResponse, ndjson_response
 from datetime import date
+from typing import Any, Callable, Dict, Iterator, List
 
 router = APIRouter()
 
+def _due_invoices(request: CustomerReportRequest) -> Any:
+    from_date = request.from_date or date(2000, 1, 1)
+    to_date = request.to_date or date.today()
+    return CustomerReportService.get_due_invoices(from_date, to_date)
+
+# Report category -> handler(request)
+_CUSTOMER_DISPATCH: Dict[str, Callable[[CustomerReportRequest], Any]] = {
+    "overview": lambda request: CustomerReportService.get_overview(),
+    "customer_balances": lambda request: CustomerReportService.get_customer_balances(request.as_of_date),
+    "due_invoices": _due_invoices,
+    "customer_list": lambda request: CustomerReportService.get_customer_list(),
+    "aging_summary": lambda request: CustomerReportService.get_aging_summary(),
+}
+
+# Categories that can be streamed as NDJSON: category -> batch iterator(request)
+_CUSTOMER_STREAMS: Dict[str, Callable[[CustomerReportRequest], Iterator[List[Any]]]] = {
+    "customer_balances": lambda request: CustomerReportService.iter_customer_balances(request.as_of_date),
+}
+
 @router.post("/customers", response_model=StandardResponse)
 def get_customer_report(request: CustomerReportRequest):
     """Generate customer reports based on category"""
     
     try:
-        if request.category == "overview":
-            data = CustomerReportService.get_overview()
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "customer_balances":
-            data = CustomerReportService.get_customer_balances(request.as_of_date)
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "due_invoices":
-            from_date = request.from_date or date(2000, 1, 1)
-            to_date = request.to_date or date.today()
-            data = CustomerReportService.get_due_invoices(from_date, to_date)
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "customer_list":
-            data = CustomerReportService.get_customer_list()
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "aging_summary":
-            data = CustomerReportService.get_aging_summary()
-            return StandardResponse(success=1, data=data)
-            
-        else:
+        handler = _CUSTOMER_DISPATCH.get(request.category)
+        if handler is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid category"
             )
         
+        stream = _CUSTOMER_STREAMS.get(request.category) if request.stream else None
+        if stream is not None:
+            return ndjson_response(stream(request))
+        
+        data = handler(request)
+        # Rendered in one orjson pass; response_model still documents the shape
+        return ORJSONResponse({"success": 1, "message": None, "data": data})
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -1,81 +1,76 @@
 from fastapi import APIRouter, HTTPException, status
 from app.schemas.reports import InventoryReportRequest, StandardResponse
 from app.services.inventory_service import InventoryReportService
-from datetime import date
+from app.utils import ORJSONResponse, ndjson_response
+from typing import Any, Callable, Dict, Iterator, List
 
 router = APIRouter()
 
+# Missing from/to dates are defaulted by the service SQL
+def _top_selling(request: InventoryReportRequest) -> Any:
+    return InventoryReportService.get_top_selling(request.from_date, request.to_date, request.limit or 5)
+
+def _slow_moving(request: InventoryReportRequest) -> Any:
+    return InventoryReportService.get_slow_moving(request.from_date, request.to_date, request.limit or 5)
+
+def _turnover_rate(request: InventoryReportRequest) -> Any:
+    return InventoryReportService.get_turnover_rate(request.fromdate, request.todate)
+
+def _incoming_stock(request: InventoryReportRequest) -> Any:
+    return InventoryReportService.get_incoming_stock(request.from_date, request.to_date, request.location)
+
+def _outgoing_stock(request: InventoryReportRequest) -> Any:
+    return InventoryReportService.get_outgoing_stock(request.from_date, request.to_date)
+
+def _dead_stock(request: InventoryReportRequest) -> Any:
+    return InventoryReportService.get_dead_stock(request.from_date, request.to_date, request.location)
+
+# Report category -> handler(request)
+_INVENTORY_DISPATCH: Dict[str, Callable[[InventoryReportRequest], Any]] = {
+    "summary": lambda request: InventoryReportService.get_summary(),
+    "stock_levels": lambda request: InventoryReportService.get_stock_levels(request.location_id),
+    "low_stock": lambda request: InventoryReportService.get_low_stock(request.threshold or 10),
+    "overstock": lambda request: InventoryReportService.get_overstock(request.threshold or 100),
+    "top_selling": _top_selling,
+    "slow_moving": _slow_moving,
+    "negative_quantities": lambda request: InventoryReportService.get_negative_quantities(),
+    "stock_alerts": lambda request: InventoryReportService.get_stock_alerts(
+        request.threshold or 10, request.overstock_threshold or 100
+    ),
+    "turnover_rate": _turnover_rate,
+    "incoming_stock": _incoming_stock,
+    "outgoing_stock": _outgoing_stock,
+    "dead_stock": _dead_stock,
+}
+
+# Categories that can be streamed as NDJSON: category -> batch iterator(request)
+_INVENTORY_STREAMS: Dict[str, Callable[[InventoryReportRequest], Iterator[List[Any]]]] = {
+    "stock_levels": lambda request: InventoryReportService.iter_stock_levels(request.location_id),
+    "incoming_stock": lambda request: InventoryReportService.iter_incoming_stock(
+        request.from_date, request.to_date, request.location
+    ),
+}
+
 @router.post("/inventory", response_model=StandardResponse)
 def get_inventory_report(request: InventoryReportRequest):
     """Generate inventory reports based on category"""
     
     try:
-        if request.category == "summary":
-            data = InventoryReportService.get_summary()
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "stock_levels":
-            data = InventoryReportService.get_stock_levels(request.location_id)
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "low_stock":
-            threshold = request.threshold or 10
-            data = InventoryReportService.get_low_stock(threshold)
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "overstock":
-            threshold = request.threshold or 100
-            data = InventoryReportService.get_overstock(threshold)
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "top_selling":
-            from_date = request.from_date or date.today().replace(day=1)
-            to_date = request.to_date or date.today()
-            limit = request.limit or 5
-            data = InventoryReportService.get_top_selling(from_date, to_date, limit)
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "slow_moving":
-            from_date = request.from_date or date.today().replace(day=1)
-            to_date = request.to_date or date.today()
-            limit = request.limit or 5
-            data = InventoryReportService.get_slow_moving(from_date, to_date, limit)
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "negative_quantities":
-            data = InventoryReportService.get_negative_quantities()
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "turnover_rate":
-            from_date = request.fromdate or date.today().replace(day=1)
-            to_date = request.todate or date.today()
-            data = InventoryReportService.get_turnover_rate(from_date, to_date)
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "incoming_stock":
-            from_date = request.from_date or date.today().replace(day=1)
-            to_date = request.to_date or date.today()
-            data = InventoryReportService.get_incoming_stock(from_date, to_date, request.location)
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "outgoing_stock":
-            from_date = request.from_date or date.today().replace(month=date.today().month-1)
-            to_date = request.to_date or date.today()
-            data = InventoryReportService.get_outgoing_stock(from_date, to_date)
-            return StandardResponse(success=1, data=data)
-            
-        elif request.category == "dead_stock":
-            from_date = request.from_date or date.today().replace(day=1)
-            to_date = request.to_date or date.today()
-            data = InventoryReportService.get_dead_stock(from_date, to_date, request.location)
-            return StandardResponse(success=1, data=data)
-            
-        else:
+        handler = _INVENTORY_DISPATCH.get(request.category)
+        if handler is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid category"
             )
         
+        stream = _INVENTORY_STREAMS.get(request.category) if request.stream else None
+        if stream is not None:
+            return ndjson_response(stream(request))
+        
+        data = handler(request)
+        # Rendered in one orjson pass; response_model still documents the shape
+        return ORJSONResponse({"success": 1, "message": None, "data": data})
+        
     except HTTPException:
         raise
     except Exception as e:
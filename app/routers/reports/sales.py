@@ -1,10 +1,41 @@
 from fastapi import APIRouter, HTTPException, status
 from app.schemas.reports import SalesReportRequest, StandardResponse
 from app.services.sales_service import SalesReportService
+from app.utils import ORJSONResponse, ndjson_response
 from datetime import date
+from typing import Any, Callable, Dict, Iterator, List
 
 router = APIRouter()
 
+def _item_trend(request: SalesReportRequest, from_date: date, to_date: date) -> Any:
+    if not request.filter_name:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="filter_name is required for item_trend category"
+        )
+    return SalesReportService.get_item_trend(request.filter_name)
+
+def _default_sales(request: SalesReportRequest, from_date: date, to_date: date) -> Any:
+    return SalesReportService.get_default_sales(from_date, to_date)
+
+# Report category -> handler(request, from_date, to_date)
+_SALES_DISPATCH: Dict[str, Callable[[SalesReportRequest, date, date], Any]] = {
+    "today_hourly": lambda request, from_date, to_date: SalesReportService.get_today_hourly_sales(),
+    "rep": lambda request, from_date, to_date: SalesReportService.get_rep_sales(from_date, to_date),
+    "location": lambda request, from_date, to_date: SalesReportService.get_location_sales(from_date, to_date),
+    "route": lambda request, from_date, to_date: SalesReportService.get_route_sales(from_date, to_date),
+    "category": lambda request, from_date, to_date: SalesReportService.get_category_sales(from_date, to_date),
+    "item": lambda request, from_date, to_date: SalesReportService.get_item_sales(from_date, to_date),
+    "item_trend": _item_trend,
+    "customer": lambda request, from_date, to_date: SalesReportService.get_customer_sales(from_date, to_date),
+    "inventory": lambda request, from_date, to_date: SalesReportService.get_inventory_sales(from_date, to_date),
+}
+
+# Categories that can be streamed as NDJSON: category -> batch iterator(request, from_date, to_date)
+_SALES_STREAMS: Dict[str, Callable[[SalesReportRequest, date, date], Iterator[List[Any]]]] = {
+    "item": lambda request, from_date, to_date: SalesReportService.iter_item_sales(from_date, to_date),
+}
+
 @router.post("/sales", response_model=StandardResponse)
 def get_sales_report(request: SalesReportRequest):
     """Generate sales reports based on category"""
@@ -14,35 +45,19 @@ def get_sales_report(request: SalesReportRequest):
         from_date = request.fromdate or date.today()
         to_date = request.todate or date.today()
         
-        if request.category == "today_hourly":
-            data = SalesReportService.get_today_hourly_sales()
-        elif request.category == "rep":
-            data = SalesReportService.get_rep_sales(from_date, to_date)
-        elif request.category == "location":
-            data = SalesReportService.get_location_sales(from_date, to_date)
-        elif request.category == "route":
-            data = SalesReportService.get_route_sales(from_date, to_date)
-        elif request.category == "category":
-            data = SalesReportService.get_category_sales(from_date, to_date)
-        elif request.category == "item":
-            data = SalesReportService.get_item_sales(from_date, to_date)
-        elif request.category == "item_trend":
-            if not request.filter_name:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="filter_name is required for item_trend category"
-                )
-            data = SalesReportService.get_item_trend(request.filter_name)
-        elif request.category == "customer":
-            data = SalesReportService.get_customer_sales(from_date, to_date)
-        elif request.category == "inventory":
-            data = SalesReportService.get_inventory_sales(from_date, to_date)
-        else:
-            # Default sales report
-            data = SalesReportService.get_default_sales(from_date, to_date)
+        stream = _SALES_STREAMS.get(request.category) if request.stream else None
+        if stream is not None:
+            return ndjson_response(stream(request, from_date, to_date))
+        
+        # Unknown categories fall back to the default sales report
+        handler = _SALES_DISPATCH.get(request.category, _default_sales)
+        data = handler(request, from_date, to_date)
         
-        return StandardResponse(success=1, data=data)
+        # Rendered in one orjson pass; response_model still documents the shape
+        return ORJSONResponse({"success": 1, "message": None, "data": data})
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,12 +1,17 @@
-from fastapi import APIRouter
-from app.database import execute_query, execute_single_query
+from fastapi import APIRouter, Depends, Request
+from app.database_async import get_conn, execute_query
+from app.utils import ORJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# The supplier schema is not documented here; list columns once it is
+SUPPLIERS_LIST_SQL = "SELECT * FROM supplier LIMIT 10"
+SUPPLIERS_BY_IDS_SQL = "SELECT * FROM supplier WHERE id IN ({ids})"
 
 @router.get("/suppliers")
-def get_suppliers():
-    return execute_query('SELECT * FROM supplier LIMIT 10;')
+async def get_suppliers(conn=Depends(get_conn)):
+    return await execute_query(conn, SUPPLIERS_LIST_SQL)
 
 @router.get("/suppliers/{supplier_id}")
-def get_supplier(supplier_id: int):
-    return execute_single_query('SELECT * FROM supplier WHERE id = %s;', (supplier_id,))
+async def get_supplier(supplier_id: int, request: Request):
+    return await request.app.state.loaders.suppliers.load(supplier_id)
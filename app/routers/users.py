@@ -1,12 +1,16 @@
-from fastapi import APIRouter
-from app.database import execute_query, execute_single_query
+from fastapi import APIRouter, Depends, Request
+from app.database_async import get_conn, execute_query
+from app.utils import ORJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+USERS_LIST_SQL = "SELECT id, username, email FROM users LIMIT 10"
+USERS_BY_IDS_SQL = "SELECT id, username, email FROM users WHERE id IN ({ids})"
 
 @router.get("/users")
-def get_users():
-    return execute_query('SELECT * FROM users LIMIT 10;')
+async def get_users(conn=Depends(get_conn)):
+    return await execute_query(conn, USERS_LIST_SQL)
 
 @router.get("/users/{user_id}")
-def get_user(user_id: int):
-    return execute_single_query('SELECT id, username, email FROM users WHERE id = %s;', (user_id,))
+async def get_user(user_id: int, request: Request):
+    return await request.app.state.loaders.users.load(user_id)
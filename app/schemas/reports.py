@@ -1,9 +1,12 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from dataclasses import dataclass, field
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Optional, List
 from datetime import date, datetime
 
 # Base request schemas
 class BaseReportRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+    
     environment: str = "production"
     server_id: Optional[str] = None
     password: Optional[str] = None
@@ -13,29 +16,34 @@ class SalesReportRequest(BaseReportRequest):
     fromdate: Optional[date] = None
     todate: Optional[date] = None
     filter_name: Optional[str] = None
+    stream: bool = False  # NDJSON response for large categories
 
 class CustomerReportRequest(BaseReportRequest):
     category: str
     as_of_date: Optional[date] = None
     from_date: Optional[date] = None
     to_date: Optional[date] = None
+    stream: bool = False  # NDJSON response for large categories
 
 class InventoryReportRequest(BaseReportRequest):
     category: str
     location_id: Optional[int] = None
     threshold: Optional[int] = None
+    overstock_threshold: Optional[int] = None  # stock_alerts; threshold is its low-stock bound
     from_date: Optional[date] = None
     to_date: Optional[date] = None
     fromdate: Optional[date] = None
     todate: Optional[date] = None
     limit: Optional[int] = None
     location: Optional[str] = None
+    stream: bool = False  # NDJSON response for large categories
 
 # Response schemas
 class StandardResponse(BaseModel):
     success: int
     message: Optional[str] = None
-    data: Optional[List[dict]] = None
+    # Rows come straight from MySQL; validating each dict would only copy it
+    data: Any = None
 
 # Sales response models
 class HourlySales(BaseModel):
@@ -82,3 +90,57 @@ class StockLevel(BaseModel):
     total_stock_quantity: float
     total_stock_value: float
     items: List[dict]
+
+# Grouped report records; slotted dataclasses keep large reports compact and
+# are serialized like dicts by both pydantic and orjson
+@dataclass(slots=True)
+class DueInvoice:
+    invoice_reference: Any
+    due_date: Optional[date]
+    amount_due: Any
+    amount_paid: Any
+    balance_due: Any
+
+@dataclass(slots=True)
+class CustomerDueInvoices:
+    customer_name: str
+    total_invoices: int
+    total_due: Any
+    total_paid: Any
+    total_balance_due: Any
+    invoices: List[DueInvoice] = field(default_factory=list)
+
+@dataclass(slots=True)
+class StockItem:
+    item_id: int
+    item_name: str
+    stock_quantity: Any
+    stock_value: Any
+    locationname: str
+    last_purchased_date: Optional[datetime]
+    days_in_inventory: Optional[int]
+
+@dataclass(slots=True)
+class StockCategory:
+    category_id: int
+    category_name: str
+    total_stock_quantity: Any
+    total_stock_value: Any
+    items: List[StockItem] = field(default_factory=list)
+
+@dataclass(slots=True)
+class RouteCustomer:
+    customer_name: str
+    customer_sales: str
+    amount_paid: str
+    balance: str
+
+@dataclass(slots=True)
+class RegionRouteSales:
+    region: str
+    total_sales: float
+    total_amount_paid: float
+    total_balance: float
+    locationname: Optional[str] = None
+    currency_name: Optional[str] = None
+    customers: List[RouteCustomer] = field(default_factory=list)
@@ -0,0 +1,42 @@
+"""
+Startup self-checks run in debug mode
+"""
+import logging
+from typing import Dict, Tuple
+
+from app.database import get_db_cursor
+from app.exceptions import DatabaseError
+from app.routers.auth import USER_BY_EMAIL_SQL
+from app.routers.orders import SALES_BY_IDS_SQL
+from app.routers.purchase_orders import PURCHASE_ORDERS_BY_IDS_SQL
+from app.routers.suppliers import SUPPLIERS_BY_IDS_SQL
+from app.routers.users import USERS_BY_IDS_SQL
+
+logger = logging.getLogger(__name__)
+
+# Queries on hot routes that must be served from an index, with sample params
+CRITICAL_QUERIES: Dict[str, Tuple[str, tuple]] = {
+    "login": (USER_BY_EMAIL_SQL, ("",)),
+    "user_detail": (USERS_BY_IDS_SQL.format(ids="%s"), (0,)),
+    "sale_detail": (SALES_BY_IDS_SQL.format(ids="%s"), (0,)),
+    "supplier_detail": (SUPPLIERS_BY_IDS_SQL.format(ids="%s"), (0,)),
+    "purchase_order_detail": (PURCHASE_ORDERS_BY_IDS_SQL.format(ids="%s"), (0,)),
+}
+
+def check_query_indexes() -> None:
+    """Warn about critical queries whose EXPLAIN plan scans a whole table"""
+    # One checkout per query, so a query that fails to plan does not hide the rest
+    for name, (sql, params) in CRITICAL_QUERIES.items():
+        try:
+            with get_db_cursor() as cursor:
+                cursor.execute("EXPLAIN " + sql, params)
+                plan = cursor.fetchall()
+        except DatabaseError as e:
+            logger.warning(f"Skipping index self-check for {name!r}: {e.detail}")
+            continue
+        for row in plan:
+            if row.get("type") == "ALL" or (row.get("table") and not row.get("key")):
+                logger.warning(
+                    "Query %r scans table %s without an index; see migrations/001_add_indexes.sql",
+                    name, row.get("table")
+                )
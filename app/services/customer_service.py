@@ -1,24 +1,52 @@
-from app.database import execute_query, execute_single_query
-from typing import List, Dict, Any, Optional
+from app.cache import ttl_cached
+from app.config import settings
+from app.database import execute_query, execute_single_query, execute_stream, existing_tables
+from app.schemas.reports import CustomerDueInvoices, DueInvoice
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import date
+from itertools import chain, groupby
+from operator import itemgetter
+
+# Precomputed by migrations/002_customer_report_views.sql; rows older than
+# report_view_max_age_seconds are ignored
+OVERVIEW_VIEW_SQL = """
+    SELECT total_customers, new_customers_last_30_days, active_customers,
+           inactive_customers, customers_with_outstanding_balance
+    FROM mv_customer_overview
+    WHERE refreshed_at >= NOW() - INTERVAL %s SECOND
+"""
+AGING_VIEW_SQL = """
+    SELECT id, companyid, name, currency, `current`, sd0, sd1, sd2, sd3, Total
+    FROM mv_customer_aging
+    WHERE refreshed_at >= NOW() - INTERVAL %s SECOND
+    ORDER BY name ASC
+"""
+REPORT_VIEWS = ("mv_customer_overview", "mv_customer_aging")
 
 class CustomerReportService:
     @staticmethod
+    @ttl_cached(ttl=30, tables=("customers", "mv_customer_overview"))
     def get_overview() -> Dict[str, Any]:
         """Get customer overview statistics"""
+        if "mv_customer_overview" in existing_tables(*REPORT_VIEWS):
+            row = execute_single_query(OVERVIEW_VIEW_SQL, (settings.report_view_max_age_seconds,), use_cache=False)
+            if row:
+                return row
+        
+        # One pass over customers; each condition counts as 0/1
         sql = """
             SELECT 
-                (SELECT COUNT(*) FROM customers) AS total_customers,
-                (SELECT COUNT(*) FROM customers WHERE startdate >= NOW() - INTERVAL 30 DAY) AS new_customers_last_30_days,
-                (SELECT COUNT(*) FROM customers WHERE lastserved >= NOW() - INTERVAL 60 DAY) AS active_customers,
-                (SELECT COUNT(*) FROM customers WHERE lastserved < NOW() - INTERVAL 60 DAY) AS inactive_customers,
-                (SELECT COUNT(*) FROM customers WHERE bal > 0) AS customers_with_outstanding_balance
+                COUNT(*) AS total_customers,
+                COALESCE(SUM(startdate >= NOW() - INTERVAL 30 DAY), 0) AS new_customers_last_30_days,
+                COALESCE(SUM(lastserved >= NOW() - INTERVAL 60 DAY), 0) AS active_customers,
+                COALESCE(SUM(lastserved < NOW() - INTERVAL 60 DAY), 0) AS inactive_customers,
+                COALESCE(SUM(bal > 0), 0) AS customers_with_outstanding_balance
+            FROM customers
         """
-        return execute_single_query(sql)
+        return execute_single_query(sql, use_cache=False)
 
     @staticmethod
-    def get_customer_balances(as_of_date: Optional[date] = None) -> List[Dict[str, Any]]:
-        """Get customer balances"""
+    def _customer_balances_query(as_of_date: Optional[date] = None) -> Tuple[str, tuple]:
         sql = """
             SELECT c.code AS customer_id, 
                    c.name AS customer_name, 
@@ -35,12 +63,22 @@ class CustomerReportService:
             params = (as_of_date,)
         
         sql += " ORDER BY c.lastserved DESC"
-        
-        return execute_query(sql, params)
+        return sql, params
+
+    @staticmethod
+    def get_customer_balances(as_of_date: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Get customer balances"""
+        return execute_query(*CustomerReportService._customer_balances_query(as_of_date))
 
     @staticmethod
-    def get_due_invoices(from_date: date, to_date: date) -> List[Dict[str, Any]]:
+    def iter_customer_balances(as_of_date: Optional[date] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Stream customer balances in batches from an unbuffered cursor"""
+        return execute_stream(*CustomerReportService._customer_balances_query(as_of_date))
+
+    @staticmethod
+    def get_due_invoices(from_date: date, to_date: date) -> List[CustomerDueInvoices]:
         """Get due invoices grouped by customer"""
+        # Customer totals ride along on every invoice row as window sums
         sql = """
             SELECT 
                 c.id AS customer_id, 
@@ -49,47 +87,46 @@ class CustomerReportService:
                 s.due_date, 
                 s.sale_total_cost AS amount_due, 
                 COALESCE(s.paid, 0) AS amount_paid, 
-                COALESCE(s.balance, 0) AS balance_due
+                COALESCE(s.balance, 0) AS balance_due,
+                COUNT(*) OVER w AS total_invoices,
+                SUM(s.sale_total_cost) OVER w AS total_due,
+                SUM(COALESCE(s.paid, 0)) OVER w AS total_paid,
+                SUM(COALESCE(s.balance, 0)) OVER w AS total_balance_due
             FROM sales s
             JOIN customers c ON s.customer_id = c.id
             WHERE s.balance > 0 
             AND s.due_date BETWEEN %s AND %s
-            ORDER BY c.name, s.due_date ASC
+            WINDOW w AS (PARTITION BY c.id)
+            ORDER BY c.name, c.id, s.due_date ASC
         """
         
         rows = execute_query(sql, (from_date, to_date))
         
-        # Group by customer
-        grouped_data = {}
-        for row in rows:
-            customer_id = row['customer_id']
-            
-            if customer_id not in grouped_data:
-                grouped_data[customer_id] = {
-                    "customer_name": row['customer_name'],
-                    "total_invoices": 0,
-                    "total_due": 0,
-                    "total_paid": 0,
-                    "total_balance_due": 0,
-                    "invoices": []
-                }
-            
-            grouped_data[customer_id]["invoices"].append({
-                "invoice_reference": row["invoice_reference"],
-                "due_date": row["due_date"],
-                "amount_due": row["amount_due"],
-                "amount_paid": row["amount_paid"],
-                "balance_due": row["balance_due"]
-            })
-            
-            grouped_data[customer_id]["total_invoices"] += 1
-            grouped_data[customer_id]["total_due"] += row["amount_due"]
-            grouped_data[customer_id]["total_paid"] += row["amount_paid"]
-            grouped_data[customer_id]["total_balance_due"] += row["balance_due"]
+        grouped_data = []
+        for _, customer_rows in groupby(rows, key=itemgetter("customer_id")):
+            first = next(customer_rows)
+            grouped_data.append(CustomerDueInvoices(
+                customer_name=first["customer_name"],
+                total_invoices=first["total_invoices"],
+                total_due=first["total_due"],
+                total_paid=first["total_paid"],
+                total_balance_due=first["total_balance_due"],
+                invoices=[
+                    DueInvoice(
+                        invoice_reference=row["invoice_reference"],
+                        due_date=row["due_date"],
+                        amount_due=row["amount_due"],
+                        amount_paid=row["amount_paid"],
+                        balance_due=row["balance_due"]
+                    )
+                    for row in chain((first,), customer_rows)
+                ]
+            ))
         
-        return list(grouped_data.values())
+        return grouped_data
 
     @staticmethod
+    @ttl_cached(ttl=60, tables=("customers",))
     def get_customer_list() -> List[Dict[str, Any]]:
         """Get all customers"""
         sql = """
@@ -104,11 +141,17 @@ class CustomerReportService:
             FROM customers c
             ORDER BY c.name ASC
         """
-        return execute_query(sql)
+        return execute_query(sql, use_cache=False)
 
     @staticmethod
+    @ttl_cached(ttl=30, tables=("aging", "customers", "cust_type", "currency", "mv_customer_aging"))
     def get_aging_summary() -> List[Dict[str, Any]]:
         """Get customer aging summary"""
+        if "mv_customer_aging" in existing_tables(*REPORT_VIEWS):
+            rows = execute_query(AGING_VIEW_SQL, (settings.report_view_max_age_seconds,), use_cache=False)
+            if rows:
+                return rows
+        
         sql = """
             SELECT 
                 c.id, 
@@ -127,4 +170,4 @@ class CustomerReportService:
             INNER JOIN currency u ON c.currency_id = u.currency_id
             ORDER BY c.name ASC
         """
-        return execute_query(sql)
+        return execute_query(sql, use_cache=False)
@@ -1,6 +1,36 @@
-from app.database import execute_query, execute_single_query
-from typing import List, Dict, Any, Optional
+from app.database import execute_query, execute_single_query, execute_stream, existing_tables
+from app.schemas.reports import StockCategory, StockItem
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from datetime import date
+from itertools import chain, groupby
+from operator import itemgetter
+
+# Date bounds defaulted in SQL: a missing from-date means the first of the
+# current month, a missing to-date means today
+FROM_DATE_SQL = "COALESCE(%s, DATE_FORMAT(CURDATE(), '%Y-%m-01'))"
+TO_DATE_SQL = "COALESCE(%s, CURDATE())"
+# Exclusive upper bound for DATETIME columns, so they are compared bare and stay indexable
+BEFORE_DATE_SQL = "COALESCE(%s, CURDATE()) + INTERVAL 1 DAY"
+# Outgoing stock looks back one calendar month by default
+FROM_LAST_MONTH_SQL = "COALESCE(%s, CURDATE() - INTERVAL 1 MONTH)"
+
+# Live equivalent of the stock_by_item_loc rollup (migrations/006), used until
+# that migration has been applied
+STOCK_BY_ITEM_LOC_LIVE_SQL = """(
+    SELECT
+        stockid, loccode,
+        SUM(qty) AS qty_sum, MAX(tyme) AS last_tyme,
+        COALESCE(SUM(CASE WHEN qty > 0 THEN qty END), 0) AS in_qty_sum,
+        MAX(CASE WHEN qty > 0 THEN tyme END) AS last_in_tyme
+    FROM stockmoves
+    GROUP BY stockid, loccode
+)"""
+
+def _stock_by_item_loc() -> str:
+    """Table expression for per item/location stock: the rollup table if present"""
+    if "stock_by_item_loc" in existing_tables("stock_by_item_loc"):
+        return "stock_by_item_loc"
+    return STOCK_BY_ITEM_LOC_LIVE_SQL
 
 class InventoryReportService:
     @staticmethod
@@ -14,62 +44,75 @@ class InventoryReportService:
         return execute_single_query(sql)
 
     @staticmethod
-    def get_stock_levels(location_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get stock levels grouped by category"""
-        sql = """
+    def _stock_levels_query(location_id: Optional[int] = None) -> Tuple[str, tuple]:
+        # stock_by_item_loc holds one trigger-maintained row per (item, location)
+        sql = f"""
             SELECT 
                 c.id AS category_id,
                 c.category AS category_name,
                 i.id AS item_id,
                 i.description AS item_name,
-                SUM(st.qty) AS stock_quantity,
-                MAX(st.tyme) AS last_purchased_date,
-                DATEDIFF(NOW(), MAX(st.tyme)) AS days_in_inventory,
-                (SUM(st.qty) * i.total_cost) AS stock_value,
-                l.locationname
-            FROM stockmoves st
-            JOIN items i ON st.stockid = i.id
+                sb.qty_sum AS stock_quantity,
+                sb.last_tyme AS last_purchased_date,
+                DATEDIFF(NOW(), sb.last_tyme) AS days_in_inventory,
+                (sb.qty_sum * i.total_cost) AS stock_value,
+                l.locationname,
+                SUM(sb.qty_sum) OVER w AS total_stock_quantity,
+                SUM(sb.qty_sum * i.total_cost) OVER w AS total_stock_value
+            FROM {_stock_by_item_loc()} sb
+            JOIN items i ON sb.stockid = i.id
             JOIN items_categoryii c ON i.category_id = c.id
-            JOIN locations l ON st.loccode = l.loccode
+            JOIN locations l ON sb.loccode = l.loccode
         """
         
         params = ()
         if location_id:
-            sql += " WHERE st.loccode = %s"
+            sql += " WHERE sb.loccode = %s"
             params = (location_id,)
         
-        sql += " GROUP BY c.id, i.id, l.loccode ORDER BY c.id, stock_value DESC"
-        
-        result = execute_query(sql, params)
-        
-        # Group by categories
-        categories = {}
-        for row in result:
-            category_id = row['category_id']
-            
-            if category_id not in categories:
-                categories[category_id] = {
-                    "category_id": row["category_id"],
-                    "category_name": row["category_name"],
-                    "total_stock_quantity": 0,
-                    "total_stock_value": 0,
-                    "items": [],
-                }
-            
-            categories[category_id]["total_stock_quantity"] += row["stock_quantity"]
-            categories[category_id]["total_stock_value"] += row["stock_value"]
-            
-            categories[category_id]["items"].append({
-                "item_id": row["item_id"],
-                "item_name": row["item_name"],
-                "stock_quantity": row["stock_quantity"],
-                "stock_value": row["stock_value"],
-                "locationname": row["locationname"],
-                "last_purchased_date": row["last_purchased_date"],
-                "days_in_inventory": row["days_in_inventory"],
-            })
-        
-        return list(categories.values())
+        sql += (
+            " WINDOW w AS (PARTITION BY c.id)"
+            " ORDER BY c.id, stock_value DESC"
+        )
+        return sql, params
+
+    @staticmethod
+    def _group_stock_levels(rows: Iterable[Dict[str, Any]]) -> Iterator[StockCategory]:
+        """Fold category-ordered rows into one record per category"""
+        # Rows arrive ordered by category with its totals precomputed on each row
+        for _, category_rows in groupby(rows, key=itemgetter("category_id")):
+            first = next(category_rows)
+            yield StockCategory(
+                category_id=first["category_id"],
+                category_name=first["category_name"],
+                total_stock_quantity=first["total_stock_quantity"],
+                total_stock_value=first["total_stock_value"],
+                items=[
+                    StockItem(
+                        item_id=row["item_id"],
+                        item_name=row["item_name"],
+                        stock_quantity=row["stock_quantity"],
+                        stock_value=row["stock_value"],
+                        locationname=row["locationname"],
+                        last_purchased_date=row["last_purchased_date"],
+                        days_in_inventory=row["days_in_inventory"],
+                    )
+                    for row in chain((first,), category_rows)
+                ],
+            )
+
+    @staticmethod
+    def get_stock_levels(location_id: Optional[int] = None) -> List[StockCategory]:
+        """Get stock levels grouped by category"""
+        result = execute_query(*InventoryReportService._stock_levels_query(location_id))
+        return list(InventoryReportService._group_stock_levels(result))
+
+    @staticmethod
+    def iter_stock_levels(location_id: Optional[int] = None) -> Iterator[List[StockCategory]]:
+        """Stream stock levels, one batch per category, from an unbuffered cursor"""
+        batches = execute_stream(*InventoryReportService._stock_levels_query(location_id))
+        for category in InventoryReportService._group_stock_levels(chain.from_iterable(batches)):
+            yield [category]
 
     @staticmethod
     def get_low_stock(threshold: int = 10) -> List[Dict[str, Any]]:
@@ -96,14 +139,58 @@ class InventoryReportService:
         return execute_query(sql, (threshold,))
 
     @staticmethod
-    def get_top_selling(from_date: date, to_date: date, limit: int = 5) -> List[Dict[str, Any]]:
-        """Get top selling items"""
+    def get_stock_alerts(low_threshold: int = 10, over_threshold: int = 100) -> Dict[str, List[Dict[str, Any]]]:
+        """Get low stock, overstock and negative quantities from one aggregation"""
+        # One pass per (item, location); the item total and a first-row marker
+        # come from windows so item-level alerts need no second GROUP BY
         sql = """
+            SELECT id, description, locationname, loc_qty, item_qty, item_row
+            FROM (
+                SELECT 
+                    i.id, 
+                    i.description, 
+                    l.locationname, 
+                    SUM(st.qty) AS loc_qty,
+                    SUM(SUM(st.qty)) OVER (PARTITION BY i.id) AS item_qty,
+                    ROW_NUMBER() OVER (PARTITION BY i.id) AS item_row
+                FROM stockmoves st 
+                JOIN items i ON st.stockid = i.id 
+                LEFT JOIN locations l ON l.loccode = st.loccode 
+                GROUP BY i.id, st.loccode
+            ) AS stock
+            WHERE (loc_qty < 0 AND locationname IS NOT NULL)
+            OR (item_row = 1 AND ((item_qty < %s AND item_qty > 0) OR item_qty > %s))
+            ORDER BY loc_qty ASC
+        """
+        rows = execute_query(sql, (low_threshold, over_threshold))
+        
+        alerts = {"low_stock": [], "overstock": [], "negative_quantities": []}
+        for row in rows:
+            if row["loc_qty"] < 0 and row["locationname"] is not None:
+                alerts["negative_quantities"].append({
+                    "id": row["id"],
+                    "description": row["description"],
+                    "stock_balance": row["loc_qty"],
+                    "locationname": row["locationname"],
+                })
+            if row["item_row"] == 1:
+                quantity = row["item_qty"]
+                if 0 < quantity < low_threshold:
+                    alerts["low_stock"].append({"id": row["id"], "description": row["description"], "stock_quantity": quantity})
+                elif quantity > over_threshold:
+                    alerts["overstock"].append({"id": row["id"], "description": row["description"], "stock_quantity": quantity})
+        
+        return alerts
+
+    @staticmethod
+    def get_top_selling(from_date: Optional[date] = None, to_date: Optional[date] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get top selling items"""
+        sql = f"""
             SELECT si.description, SUM(si.quantity_purchased) AS qty, 
                    SUM(si.item_total_cost) AS total_sales 
             FROM sales_items si 
             JOIN sales s ON si.sale_id = s.id 
-            WHERE s.date BETWEEN %s AND %s 
+            WHERE s.date BETWEEN {FROM_DATE_SQL} AND {TO_DATE_SQL} 
             GROUP BY si.item_id 
             ORDER BY total_sales DESC 
             LIMIT %s
@@ -111,14 +198,14 @@ class InventoryReportService:
         return execute_query(sql, (from_date, to_date, limit))
 
     @staticmethod
-    def get_slow_moving(from_date: date, to_date: date, limit: int = 5) -> List[Dict[str, Any]]:
+    def get_slow_moving(from_date: Optional[date] = None, to_date: Optional[date] = None, limit: int = 5) -> List[Dict[str, Any]]:
         """Get slow moving items"""
-        sql = """
+        sql = f"""
             SELECT si.description, SUM(si.quantity_purchased) AS qty, 
                    SUM(si.item_total_cost) AS total_sales 
             FROM sales_items si 
             JOIN sales s ON si.sale_id = s.id 
-            WHERE s.date BETWEEN %s AND %s 
+            WHERE s.date BETWEEN {FROM_DATE_SQL} AND {TO_DATE_SQL} 
             GROUP BY si.item_id 
             ORDER BY total_sales ASC 
             LIMIT %s
@@ -140,34 +227,34 @@ class InventoryReportService:
         return execute_query(sql)
 
     @staticmethod
-    def get_turnover_rate(from_date: date, to_date: date) -> Dict[str, Any]:
+    def get_turnover_rate(from_date: Optional[date] = None, to_date: Optional[date] = None) -> Dict[str, Any]:
         """Calculate stock turnover rate"""
-        # Calculate COGS
-        sql_cogs = """
-            SELECT SUM(si.item_buy_price * si.quantity_purchased) AS cogs
-            FROM sales_items si
-            JOIN sales s ON si.sale_id = s.id
-            WHERE s.date BETWEEN %s AND %s 
-            AND si.item_buy_price > 0 
-            AND si.quantity_purchased > 0
+        # COGS and average inventory in one round trip
+        sql = f"""
+            SELECT
+                (
+                    SELECT SUM(si.item_buy_price * si.quantity_purchased)
+                    FROM sales_items si
+                    JOIN sales s ON si.sale_id = s.id
+                    WHERE s.date BETWEEN {FROM_DATE_SQL} AND {TO_DATE_SQL} 
+                    AND si.item_buy_price > 0 
+                    AND si.quantity_purchased > 0
+                ) AS cogs,
+                (
+                    SELECT AVG(total_stock)
+                    FROM (
+                        SELECT SUM(st.qty * i.total_cost) AS total_stock
+                        FROM stockmoves st
+                        JOIN items i ON st.stockid = i.id
+                        WHERE st.trandate BETWEEN {FROM_DATE_SQL} AND {TO_DATE_SQL}
+                        AND st.qty > 0
+                        AND i.total_cost > 0
+                    ) AS inventory
+                ) AS average_inventory
         """
-        cogs_result = execute_single_query(sql_cogs, (from_date, to_date))
-        cogs = float(cogs_result['cogs']) if cogs_result and cogs_result['cogs'] else 0
-        
-        # Calculate Average Inventory
-        sql_inventory = """
-            SELECT AVG(total_stock) AS average_inventory
-            FROM (
-                SELECT SUM(st.qty * i.total_cost) AS total_stock
-                FROM stockmoves st
-                JOIN items i ON st.stockid = i.id
-                WHERE st.trandate BETWEEN %s AND %s
-                AND st.qty > 0
-                AND i.total_cost > 0
-            ) AS inventory
-        """
-        inventory_result = execute_single_query(sql_inventory, (from_date, to_date))
-        average_inventory = float(inventory_result['average_inventory']) if inventory_result and inventory_result['average_inventory'] else 0
+        result = execute_single_query(sql, (from_date, to_date, from_date, to_date))
+        cogs = float(result['cogs']) if result and result['cogs'] else 0
+        average_inventory = float(result['average_inventory']) if result and result['average_inventory'] else 0
         
         # Calculate turnover rate
         stock_turnover_rate = (cogs / average_inventory) if average_inventory > 0 else 0
@@ -179,9 +266,8 @@ class InventoryReportService:
         }
 
     @staticmethod
-    def get_incoming_stock(from_date: date, to_date: date, location: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get incoming stock movements"""
-        sql = """
+    def _incoming_stock_query(from_date: Optional[date], to_date: Optional[date], location: Optional[str]) -> Tuple[str, tuple]:
+        sql = f"""
             SELECT 
                 st.stkmoveno,
                 i.description AS item_name,
@@ -194,7 +280,7 @@ class InventoryReportService:
             JOIN items i ON st.stockid = i.id
             JOIN locations l ON st.loccode = l.loccode
             WHERE st.qty > 0
-            AND DATE(st.tyme) BETWEEN %s AND %s
+            AND st.tyme >= {FROM_DATE_SQL} AND st.tyme < {BEFORE_DATE_SQL}
         """
         
         params = [from_date, to_date]
@@ -203,13 +289,22 @@ class InventoryReportService:
             params.append(location)
         
         sql += " ORDER BY st.tyme DESC"
-        
-        return execute_query(sql, params)
+        return sql, tuple(params)
 
     @staticmethod
-    def get_outgoing_stock(from_date: date, to_date: date) -> List[Dict[str, Any]]:
+    def get_incoming_stock(from_date: Optional[date] = None, to_date: Optional[date] = None, location: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get incoming stock movements"""
+        return execute_query(*InventoryReportService._incoming_stock_query(from_date, to_date, location))
+
+    @staticmethod
+    def iter_incoming_stock(from_date: Optional[date] = None, to_date: Optional[date] = None, location: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Stream incoming stock movements in batches from an unbuffered cursor"""
+        return execute_stream(*InventoryReportService._incoming_stock_query(from_date, to_date, location))
+
+    @staticmethod
+    def get_outgoing_stock(from_date: Optional[date] = None, to_date: Optional[date] = None) -> List[Dict[str, Any]]:
         """Get outgoing stock movements"""
-        sql = """
+        sql = f"""
             SELECT 
                 i.id AS item_id,
                 i.description AS item_name,
@@ -221,38 +316,37 @@ class InventoryReportService:
             JOIN items i ON st.stockid = i.id
             JOIN locations l ON st.loccode = l.loccode
             WHERE st.qty < 0  
-            AND DATE(st.tyme) BETWEEN %s AND %s
+            AND st.tyme >= {FROM_LAST_MONTH_SQL} AND st.tyme < {BEFORE_DATE_SQL}
             GROUP BY i.id, l.locationname
             ORDER BY total_stock_value DESC
         """
         return execute_query(sql, (from_date, to_date))
 
     @staticmethod
-    def get_dead_stock(from_date: date, to_date: date, location: Optional[str] = None) -> List[Dict[str, Any]]:
+    def get_dead_stock(from_date: Optional[date] = None, to_date: Optional[date] = None, location: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get dead stock (items not sold in period)"""
-        sql = """
+        sql = f"""
             SELECT 
                 i.id AS item_id, 
                 i.description AS item_name, 
                 c.category AS category_name, 
-                SUM(st.qty) AS stock_quantity, 
-                (SUM(st.qty) * i.total_cost) AS stock_value, 
-                MAX(st.tyme) AS last_purchased_date,
-                DATEDIFF(NOW(), MAX(st.tyme)) AS days_in_inventory,
+                SUM(sb.in_qty_sum) AS stock_quantity, 
+                (SUM(sb.in_qty_sum) * i.total_cost) AS stock_value, 
+                MAX(sb.last_in_tyme) AS last_purchased_date,
+                DATEDIFF(NOW(), MAX(sb.last_in_tyme)) AS days_in_inventory,
                 l.locationname AS warehouse_location
-            FROM stockmoves st
-            JOIN items i ON st.stockid = i.id
-            JOIN locations l ON st.loccode = l.loccode
+            FROM {_stock_by_item_loc()} sb
+            JOIN items i ON sb.stockid = i.id
+            JOIN locations l ON sb.loccode = l.loccode
             JOIN items_categoryii c ON i.category_id = c.id
-            LEFT JOIN (
-                SELECT si.item_id
+            WHERE sb.last_in_tyme IS NOT NULL
+            AND NOT EXISTS (
+                SELECT 1
                 FROM sales_items si
                 JOIN sales s ON si.sale_id = s.id
-                WHERE s.date BETWEEN %s AND %s
-                GROUP BY si.item_id
-            ) sales_data ON i.id = sales_data.item_id
-            WHERE sales_data.item_id IS NULL
-            AND st.qty > 0
+                WHERE si.item_id = i.id
+                AND s.date BETWEEN {FROM_DATE_SQL} AND {TO_DATE_SQL}
+            )
             GROUP BY i.id, l.locationname, c.category
             ORDER BY stock_value DESC
         """
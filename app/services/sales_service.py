@@ -1,21 +1,44 @@
-from app.database import execute_query, execute_single_query
-from typing import List, Dict, Any, Optional
+from app.cache import ttl_cached
+from app.database import execute_query, execute_single_query, execute_stream
+from app.schemas.reports import RegionRouteSales, RouteCustomer
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import date
 
+ITEM_SALES_SQL = """
+    SELECT si.description, SUM(si.quantity_purchased) AS qty, SUM(si.item_total_cost) AS total_sales, 
+           SUM(si.item_buy_price * si.quantity_purchased) AS cost, 
+           (SUM(si.item_total_cost) - SUM(si.item_buy_price * si.quantity_purchased)) AS margin, 
+           c.symbol AS currency_name, si.unit, l.locationname AS location
+    FROM sales s 
+    JOIN sales_items si ON s.id=si.sale_id 
+    JOIN currency c ON s.currency_id=c.currency_id  
+    JOIN locations l ON s.loccode=l.loccode
+    WHERE s.type IN ('10', '14') 
+    AND s.date BETWEEN %s AND %s 
+    GROUP BY si.item_id, c.currency_id, l.loccode
+    ORDER BY total_sales DESC
+"""
+
+# Dashboard reports below run on prepared statements (prepared=True): their SQL
+# is constant, so each pooled connection parses and plans it once
 class SalesReportService:
     @staticmethod
+    @ttl_cached(ttl=10, tables=("sales", "currency"))
     def get_today_hourly_sales() -> List[Dict[str, Any]]:
         """Get today's sales grouped by hour"""
         sql = """
-            SELECT HOUR(s.tyme) AS hour, SUM(s.sale_total_cost) AS total_sales, c.symbol AS currency_name 
-            FROM sales s 
-            JOIN currency c ON s.currency_id=c.currency_id 
-            WHERE s.date = CURDATE() 
-            AND (s.type = '10' OR s.type = '14') 
-            GROUP BY HOUR(s.tyme), c.currency_id 
-            ORDER BY HOUR(s.tyme) ASC
+            SELECT t.hour, t.total_sales, c.symbol AS currency_name 
+            FROM (
+                SELECT HOUR(s.tyme) AS hour, s.currency_id, SUM(s.sale_total_cost) AS total_sales 
+                FROM sales s 
+                WHERE s.date = CURDATE() 
+                AND s.type IN ('10', '14') 
+                GROUP BY HOUR(s.tyme), s.currency_id
+            ) t 
+            JOIN currency c ON t.currency_id=c.currency_id 
+            ORDER BY t.hour ASC
         """
-        return execute_query(sql)
+        return execute_query(sql, use_cache=False, prepared=True)
 
     @staticmethod
     def get_rep_sales(from_date: date, to_date: date) -> List[Dict[str, Any]]:
@@ -25,12 +48,12 @@ class SalesReportService:
             FROM sales s 
             JOIN users u ON s.rep = u.id 
             JOIN currency c ON s.currency_id=c.currency_id 
-            WHERE (s.type = '10' OR s.type = '14') 
+            WHERE s.type IN ('10', '14') 
             AND s.date BETWEEN %s AND %s 
             GROUP BY s.date, u.username, c.currency_id 
             ORDER BY s.date ASC, total_sales DESC
         """
-        return execute_query(sql, (from_date, to_date))
+        return execute_query(sql, (from_date, to_date), prepared=True)
 
     @staticmethod
     def get_location_sales(from_date: date, to_date: date) -> List[Dict[str, Any]]:
@@ -40,64 +63,68 @@ class SalesReportService:
             FROM sales s 
             JOIN locations l ON s.loccode = l.loccode 
             JOIN currency c ON s.currency_id=c.currency_id 
-            WHERE (s.type = '10' OR s.type = '14') 
+            WHERE s.type IN ('10', '14') 
             AND s.date BETWEEN %s AND %s 
             GROUP BY s.loccode, c.currency_id, s.date
         """
-        return execute_query(sql, (from_date, to_date))
+        return execute_query(sql, (from_date, to_date), prepared=True)
 
     @staticmethod
-    def get_route_sales(from_date: date, to_date: date) -> List[Dict[str, Any]]:
+    def get_route_sales(from_date: date, to_date: date) -> List[RegionRouteSales]:
         """Get sales by route with customers grouped"""
+        # WITH ROLLUP adds a subtotal row per region; the HAVING clause keeps
+        # only those and the per-customer rows, region totals sorted first.
+        # Customer amounts are sent as 2dp strings, formatted by MySQL
         sql = """
             SELECT 
                 cr.region, 
                 l.locationname, 
                 c.symbol AS currency_name, 
+                cu.name AS customer_name, 
                 SUM(s.sale_total_cost) AS total_sales, 
                 SUM(s.paid) AS total_amount_paid, 
                 (SUM(s.sale_total_cost) - SUM(s.paid)) AS total_balance,
-                cu.name AS customer_name, 
-                SUM(s.sale_total_cost) AS customer_sales, 
-                SUM(s.paid) AS customer_amount_paid, 
-                (SUM(s.sale_total_cost) - SUM(s.paid)) AS customer_balance
+                CAST(CAST(SUM(s.sale_total_cost) AS DECIMAL(20, 2)) AS CHAR) AS sales_text,
+                CAST(CAST(SUM(s.paid) AS DECIMAL(20, 2)) AS CHAR) AS paid_text,
+                CAST(CAST(SUM(s.sale_total_cost) - SUM(s.paid) AS DECIMAL(20, 2)) AS CHAR) AS balance_text,
+                GROUPING(l.locationname) AS is_region_total
             FROM sales s 
             JOIN customer_regions cr ON s.region_id = cr.region_id 
             JOIN locations l ON s.loccode = l.loccode 
             JOIN currency c ON s.currency_id = c.currency_id 
             JOIN customers cu ON s.customer_id = cu.id
-            WHERE (s.type = '10' OR s.type = '14') 
+            WHERE s.type IN ('10', '14') 
             AND s.date BETWEEN %s AND %s 
-            GROUP BY cr.region, l.locationname, c.symbol, cu.name 
-            ORDER BY total_sales DESC
+            GROUP BY cr.region, l.locationname, c.symbol, cu.name WITH ROLLUP
+            HAVING GROUPING(cr.region) = 0 
+            AND (GROUPING(l.locationname) = 1 OR GROUPING(cu.name) = 0)
+            ORDER BY is_region_total DESC, total_sales DESC
         """
         data = execute_query(sql, (from_date, to_date))
         
-        # Group data by region
         grouped_data = {}
         for row in data:
-            region = row['region']
-            if region not in grouped_data:
-                grouped_data[region] = {
-                    'region': row['region'],
-                    'total_sales': 0,
-                    'total_amount_paid': 0,
-                    'total_balance': 0,
-                    'locationname': row['locationname'],
-                    'currency_name': row['currency_name'],
-                    'customers': []
-                }
+            if row['is_region_total']:
+                grouped_data[row['region']] = RegionRouteSales(
+                    region=row['region'],
+                    total_sales=float(row['total_sales']),
+                    total_amount_paid=float(row['total_amount_paid']),
+                    total_balance=float(row['total_balance'])
+                )
+                continue
             
-            grouped_data[region]['total_sales'] += float(row['customer_sales'])
-            grouped_data[region]['total_amount_paid'] += float(row['customer_amount_paid'])
-            grouped_data[region]['total_balance'] += float(row['customer_balance'])
+            region = grouped_data[row['region']]
+            if not region.customers:
+                # A region reports the location and currency of its top customer row
+                region.locationname = row['locationname']
+                region.currency_name = row['currency_name']
             
-            grouped_data[region]['customers'].append({
-                'customer_name': row['customer_name'],
-                'customer_sales': f"{row['customer_sales']:.2f}",
-                'amount_paid': f"{row['customer_amount_paid']:.2f}",
-                'balance': f"{row['customer_balance']:.2f}"
-            })
+            region.customers.append(RouteCustomer(
+                customer_name=row['customer_name'],
+                customer_sales=row['sales_text'],
+                amount_paid=row['paid_text'],
+                balance=row['balance_text']
+            ))
         
         return list(grouped_data.values())
 
@@ -114,7 +141,7 @@ class SalesReportService:
             JOIN items i ON si.item_id=i.id 
             JOIN items_categoryii c ON i.category_id=c.id 
             JOIN currency cur ON s.currency_id=cur.currency_id 
-            WHERE (s.type = '10' OR s.type = '14') 
+            WHERE s.type IN ('10', '14') 
             AND s.date BETWEEN %s AND %s 
             GROUP BY c.id, cur.currency_id 
             ORDER BY total_sales DESC
@@ -124,21 +151,12 @@ class SalesReportService:
     @staticmethod
     def get_item_sales(from_date: date, to_date: date) -> List[Dict[str, Any]]:
         """Get sales by item"""
-        sql = """
-            SELECT si.description, SUM(si.quantity_purchased) AS qty, SUM(si.item_total_cost) AS total_sales, 
-                   SUM(si.item_buy_price * si.quantity_purchased) AS cost, 
-                   (SUM(si.item_total_cost) - SUM(si.item_buy_price * si.quantity_purchased)) AS margin, 
-                   c.symbol AS currency_name, si.unit, l.locationname AS location
-            FROM sales s 
-            JOIN sales_items si ON s.id=si.sale_id 
-            JOIN currency c ON s.currency_id=c.currency_id  
-            JOIN locations l ON s.loccode=l.loccode
-            WHERE (s.type = '10' OR s.type = '14') 
-            AND s.date BETWEEN %s AND %s 
-            GROUP BY si.item_id, c.currency_id, l.loccode
-            ORDER BY total_sales DESC
-        """
-        return execute_query(sql, (from_date, to_date))
+        return execute_query(ITEM_SALES_SQL, (from_date, to_date), prepared=True)
+
+    @staticmethod
+    def iter_item_sales(from_date: date, to_date: date) -> Iterator[List[Dict[str, Any]]]:
+        """Stream sales by item in row batches"""
+        return execute_stream(ITEM_SALES_SQL, (from_date, to_date))
 
     @staticmethod
     def get_item_trend(filter_name: str) -> List[Dict[str, Any]]:
@@ -152,7 +170,7 @@ class SalesReportService:
             FROM sales s 
             JOIN sales_items si ON s.id=si.sale_id 
             JOIN currency c ON s.currency_id=c.currency_id  
-            WHERE (s.type = '10' OR s.type = '14') 
+            WHERE s.type IN ('10', '14') 
             AND si.description = %s
             GROUP BY si.item_id, c.currency_id, s.date
             ORDER BY s.date ASC
@@ -172,7 +190,7 @@ class SalesReportService:
             FROM sales s 
             JOIN customers c ON s.customer_id = c.id 
             JOIN currency cur ON s.currency_id = cur.currency_id 
-            WHERE (s.type = '10' OR s.type = '14') 
+            WHERE s.type IN ('10', '14') 
             AND s.date BETWEEN %s AND %s 
             GROUP BY s.customer_id, cur.currency_id 
             ORDER BY c.name
@@ -196,11 +214,14 @@ class SalesReportService:
     def get_default_sales(from_date: date, to_date: date) -> List[Dict[str, Any]]:
         """Get default sales data"""
         sql = """
-            SELECT s.date, SUM(s.sale_total_cost) AS total_sales, c.symbol AS currency_name 
-            FROM sales s 
-            JOIN currency c ON s.currency_id=c.currency_id 
-            WHERE (s.type = '10' OR s.type = '14') 
-            AND s.date BETWEEN %s AND %s 
-            GROUP BY s.date, c.currency_id
+            SELECT t.date, t.total_sales, c.symbol AS currency_name 
+            FROM (
+                SELECT s.date, s.currency_id, SUM(s.sale_total_cost) AS total_sales 
+                FROM sales s 
+                WHERE s.type IN ('10', '14') 
+                AND s.date BETWEEN %s AND %s 
+                GROUP BY s.date, s.currency_id
+            ) t 
+            JOIN currency c ON t.currency_id=c.currency_id
         """
-        return execute_query(sql, (from_date, to_date))
+        return execute_query(sql, (from_date, to_date), prepared=True)
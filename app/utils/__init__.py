@@ -3,9 +3,15 @@ Utility functions for the application
 """
 import logging
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, Optional
+from decimal import Decimal
+from functools import lru_cache, partial
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, Optional
 import json
 
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
+
 def setup_logging(level: str = "INFO"):
     """Setup application logging"""
     logging.basicConfig(
@@ -23,6 +29,37 @@ def serialize_datetime(obj: Any) -> Any:
         return obj.isoformat()
     raise TypeError(f"Type {type(obj)} not serializable")
 
+def json_default(obj: Any) -> Any:
+    """orjson fallback for types MySQL rows carry that orjson does not encode"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, timedelta):
+        return obj.total_seconds()
+    return serialize_datetime(obj)
+
+# Shared orjson encoder; datetimes, dates and UUIDs are encoded natively in C
+dumps = partial(orjson.dumps, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def orjson_lines(batches: Iterable[Iterable[Any]]) -> Iterator[bytes]:
+    """Encode batches of records as newline-delimited JSON, one chunk per batch"""
+    for batch in batches:
+        chunk = b"".join(dumps(item) + b"\n" for item in batch)
+        if chunk:
+            yield chunk
+
+def ndjson_response(batches: Iterable[Iterable[Any]]) -> StreamingResponse:
+    """Stream batches as NDJSON, pulling the first batch now so query errors surface before headers are sent"""
+    batches = iter(batches)
+    first = next(batches, None)
+    head = [] if first is None else [first]
+    return StreamingResponse(orjson_lines(chain(head, batches)), media_type="application/x-ndjson")
+
 def safe_float(value: Any, default: float = 0.0) -> float:
     """Safely convert value to float"""
     try:
@@ -41,30 +78,30 @@ def format_currency(amount: float, currency: str = "USD") -> str:
     """Format currency with proper symbols"""
     return f"{currency} {amount:,.2f}"
 
+@lru_cache(maxsize=32)
+def _date_range(period: str, day: int) -> tuple[date, date]:
+    today = date.fromordinal(day)
+    
+    if period == "today":
+        return today, today
+    elif period == "yesterday":
+        yesterday = today - timedelta(days=1)
+        return yesterday, yesterday
+    elif period == "this_week":
+        start = today - timedelta(days=today.weekday())
+        return start, today
+    elif period == "this_month":
+        start = today.replace(day=1)
+        return start, today
+    elif period == "last_month":
+        end = today.replace(day=1) - timedelta(days=1)
+        return end.replace(day=1), end
+    else:
+        return today, today
+
 class DateHelper:
     @staticmethod
     def get_date_range(period: str) -> tuple[date, date]:
         """Get date range for common periods"""
-        today = date.today()
-        
-        if period == "today":
-            return today, today
-        elif period == "yesterday":
-            yesterday = today.replace(day=today.day - 1)
-            return yesterday, yesterday
-        elif period == "this_week":
-            start = today - timedelta(days=today.weekday())
-            return start, today
-        elif period == "this_month":
-            start = today.replace(day=1)
-            return start, today
-        elif period == "last_month":
-            if today.month == 1:
-                start = today.replace(year=today.year - 1, month=12, day=1)
-                end = today.replace(day=1) - timedelta(days=1)
-            else:
-                start = today.replace(month=today.month - 1, day=1)
-                end = today.replace(day=1) - timedelta(days=1)
-            return start, end
-        else:
-            return today, today
+        # Ranges only change with the day, so compute each one once per day
+        return _date_range(period, date.today().toordinal())
@@ -30,7 +30,7 @@ check_server() {
         echo ""
     else
         echo "❌ Server is not running. Please start the FastAPI server first:"
-        echo "   python app.py"
+        echo "   python -m app.main"
         exit 1
     fi
 }
@@ -5,17 +5,34 @@ Authentication Example for FastAPI ERP System
 This example demonstrates how to authenticate with the API and make authenticated requests.
 """
 
-import requests
+import asyncio
+import httpx
 import json
+import socket
 from typing import Optional, Dict, Any
 
+# Connections kept open per host; size it to the number of concurrent callers
+POOL_SIZE = 20
+LIMITS = httpx.Limits(max_keepalive_connections=POOL_SIZE, max_connections=POOL_SIZE)
+HEADERS = {"Content-Type": "application/json"}
+
+# Send small writes immediately and probe idle pooled connections
+SOCKET_OPTIONS = [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
 
 class FastAPIClient:
     """Simple client for FastAPI ERP System."""
     
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url.rstrip("/")
-        self.session = requests.Session()
+        # HTTP/2 multiplexes concurrent requests over one keep-alive TLS connection
+        self.session = httpx.Client(
+            headers=HEADERS,
+            transport=httpx.HTTPTransport(http2=True, limits=LIMITS, retries=3, socket_options=SOCKET_OPTIONS),
+        )
         self.user_data: Optional[Dict[str, Any]] = None
     
     def login(self, username: str, password: str) -> bool:
@@ -35,8 +52,7 @@ class FastAPIClient:
                 json={
                     "username": username,
                     "password": password
-                },
-                headers={"Content-Type": "application/json"}
+                }
             )
             
             if response.status_code == 200:
@@ -58,7 +74,7 @@ class FastAPIClient:
                     print(f"   Error: {response.text}")
                 return False
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"❌ Network error during login: {e}")
             return False
     
@@ -80,7 +96,7 @@ class FastAPIClient:
             print(f"❌ Failed to get current user: {response.status_code}")
             return None
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"❌ Network error getting current user: {e}")
             return None
     
@@ -95,59 +111,108 @@ class FastAPIClient:
         print("🔓 Logged out successfully")
 
 
-def main():
+class AsyncFastAPIClient:
+    """Async client for FastAPI ERP System; concurrent calls share one HTTP/2 connection."""
+    
+    def __init__(self, base_url: str = "http://localhost:8000"):
+        self.base_url = base_url.rstrip("/")
+        self.session = httpx.AsyncClient(
+            headers=HEADERS,
+            transport=httpx.AsyncHTTPTransport(http2=True, limits=LIMITS, retries=3, socket_options=SOCKET_OPTIONS),
+        )
+        self.user_data: Optional[Dict[str, Any]] = None
+    
+    async def __aenter__(self) -> "AsyncFastAPIClient":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.session.aclose()
+    
+    async def login(self, username: str, password: str) -> bool:
+        """Authenticate with the API; returns True if login succeeded."""
+        try:
+            response = await self.session.post(
+                f"{self.base_url}/api/v1/auth/login",
+                json={"username": username, "password": password}
+            )
+            if response.status_code != 200:
+                print(f"❌ Login request failed with status code: {response.status_code}")
+                return False
+            data = response.json()
+        except httpx.HTTPError as e:
+            print(f"❌ Network error during login: {e}")
+            return False
+        
+        if not data.get("success"):
+            print(f"❌ Login failed: {data.get('message', 'Unknown error')}")
+            return False
+        self.user_data = data.get("data")
+        print(f"✅ Login successful for user: {username}")
+        return True
+    
+    async def get_current_user(self) -> Optional[Dict[str, Any]]:
+        """Get current user information, or None on failure."""
+        try:
+            response = await self.session.get(f"{self.base_url}/api/v1/auth/me")
+            if response.status_code == 200:
+                data = response.json()
+                if data.get("success"):
+                    return data.get("data")
+            print(f"❌ Failed to get current user: {response.status_code}")
+            return None
+        except httpx.HTTPError as e:
+            print(f"❌ Network error getting current user: {e}")
+            return None
+    
+    async def get_status(self, path: str) -> Optional[int]:
+        """Return the HTTP status of a GET on path, or None on network error."""
+        try:
+            response = await self.session.get(f"{self.base_url}{path}")
+            return response.status_code
+        except httpx.HTTPError as e:
+            print(f"ℹ️  Could not reach {path}: {e}")
+            return None
+
+
+async def main():
     """Demonstrate authentication workflow."""
     print("🚀 FastAPI ERP System - Authentication Example")
     print("=" * 50)
     
-    # Create client
-    client = FastAPIClient()
-    
-    # Example 1: Successful login
-    print("\n📋 Example 1: User Login")
-    print("-" * 30)
-    
     # Note: Replace with actual credentials from your database
     username = input("Enter username (or press Enter for 'admin'): ").strip() or "admin"
     password = input("Enter password (or press Enter for 'password'): ").strip() or "password"
     
-    if client.login(username, password):
+    async with AsyncFastAPIClient() as client:
+        # Example 1: Successful login
+        print("\n📋 Example 1: User Login")
+        print("-" * 30)
+        
+        if not await client.login(username, password):
+            print("❌ Authentication failed!")
+            return
         print(f"✅ Authentication successful!")
         
-        # Get current user info
-        user_info = client.get_current_user()
+        # Example 2: Fetch user info and a protected endpoint concurrently
+        print("\n📊 Example 2: Making Authenticated Requests")
+        print("-" * 40)
+        
+        # This is just an example - replace with actual endpoint
+        user_info, status = await asyncio.gather(
+            client.get_current_user(),
+            client.get_status("/api/v1/customers/"),
+        )
         if user_info:
             print(f"📄 Current user info:")
             for key, value in user_info.items():
                 print(f"   {key}: {value}")
-    else:
-        print("❌ Authentication failed!")
-        return
-    
-    # Example 2: Check authentication status
-    print(f"\n🔍 Authentication Status: {'✅ Authenticated' if client.is_authenticated() else '❌ Not authenticated'}")
-    
-    # Example 3: Make authenticated request (if you have other endpoints)
-    print("\n📊 Example 2: Making Authenticated Requests")
-    print("-" * 40)
-    
-    if client.is_authenticated():
-        # Try to access a protected endpoint (example)
-        try:
-            # This is just an example - replace with actual endpoint
-            response = client.session.get(f"{client.base_url}/api/v1/customers/")
-            if response.status_code == 200:
-                print("✅ Successfully accessed protected endpoint")
-            else:
-                print(f"ℹ️  Endpoint returned status: {response.status_code}")
-        except Exception as e:
-            print(f"ℹ️  Could not test protected endpoint: {e}")
+        if status == 200:
+            print("✅ Successfully accessed protected endpoint")
+        elif status is not None:
+            print(f"ℹ️  Endpoint returned status: {status}")
     
-    # Example 4: Logout
-    print("\n🔓 Example 3: Logout")
-    print("-" * 20)
-    client.logout()
+    print("\n🔓 Session closed")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
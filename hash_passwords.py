@@ -2,30 +2,69 @@
 Script to hash existing plain text passwords in your database
 Run this ONCE to convert plain text passwords to hashed passwords
 """
-from app.database import get_db_cursor
-from app.auth import get_password_hash
+from concurrent.futures import ProcessPoolExecutor
+
+from app.database import execute_stream, get_db_connection
+from app.auth import get_password_hash, pwd_context
+
+# Rows pulled from the server per round trip; also the hashing/update batch size
+BATCH_SIZE = 1000
+# Rows per multi-row UPDATE statement
+UPDATE_PAGE_SIZE = 500
+
+# mysql-connector only rewrites INSERTs in executemany, so an UPDATE batch
+# would still be one round trip per row; join against a VALUES table instead
+UPDATE_HASHES_SQL = """
+    UPDATE users u
+    JOIN (VALUES {rows}) AS data (password_hash, id) ON u.id = data.id
+    SET u.password_hash = data.password_hash
+"""
+
+def _init_worker():
+    """Resolve the bcrypt handler and load its backend once per worker process"""
+    pwd_context.handler().get_backend()
+
+def _write_hashes(cursor, rows):
+    """Store (password_hash, id) pairs with one UPDATE per UPDATE_PAGE_SIZE rows"""
+    for start in range(0, len(rows), UPDATE_PAGE_SIZE):
+        page = rows[start:start + UPDATE_PAGE_SIZE]
+        sql = UPDATE_HASHES_SQL.format(rows=", ".join(["ROW(%s, %s)"] * len(page)))
+        cursor.execute(sql, [value for row in page for value in row])
 
 def hash_existing_passwords():
     """Hash all plain text passwords in the users table"""
-    with get_db_cursor() as cursor:
-        # Get all users with plain text passwords
-        cursor.execute("SELECT id, username, password FROM users WHERE password_hash IS NULL OR password_hash = ''")
-        users = cursor.fetchall()
-        
-        for user in users:
-            if user['password']:  # If password exists
-                hashed_password = get_password_hash(user['password'])
-                
-                # Update with hashed password
-                cursor.execute(
-                    "UPDATE users SET password_hash = %s WHERE id = %s", 
-                    (hashed_password, user['id'])
-                )
-                print(f"Hashed password for user: {user['username']}")
-        
+    # Rows stream in on one pooled connection while updates go out on another,
+    # so memory stays bounded by BATCH_SIZE and hashing starts after the first batch
+    batches = execute_stream(
+        "SELECT id, username, password FROM users WHERE password_hash IS NULL OR password_hash = ''",
+        chunk=BATCH_SIZE
+    )
+    # Pooled connections autocommit; hold every UPDATE in one transaction so a
+    # failure part-way rolls the whole run back and the script can simply be rerun
+    conn = get_db_connection()
+    try:
+        conn.start_transaction()
+        cursor = conn.cursor()
+        with ProcessPoolExecutor(initializer=_init_worker) as executor:
+            for batch in batches:
+                users = [user for user in batch if user['password']]
+
+                # bcrypt is CPU-bound by design; hash on every core
+                hashes = executor.map(get_password_hash, [user['password'] for user in users], chunksize=64)
+
+                # Update with hashed passwords
+                _write_hashes(cursor, [(hashed_password, user['id']) for hashed_password, user in zip(hashes, users)])
+                for user in users:
+                    print(f"Hashed password for user: {user['username']}")
+
         # Commit changes
-        cursor.connection.commit()
+        conn.commit()
         print("Password hashing completed!")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
 if __name__ == "__main__":
     hash_existing_passwords()
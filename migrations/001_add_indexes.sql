@@ -0,0 +1,19 @@
+-- Indexes backing the login lookup and the id-based detail routes.
+-- Run once against the application database:
+--   mysql -u root -p wholesale < migrations/001_add_indexes.sql
+
+-- POST /auth/login and GET /auth/debug/{email}: equality on email, then active
+CREATE INDEX idx_users_email_active ON users (email, active);
+
+-- Detail routes look rows up by id; each table must have it as its primary key.
+-- This lists any of them that do not, so the key can be added by hand.
+SELECT t.table_name
+FROM information_schema.tables t
+LEFT JOIN information_schema.key_column_usage k
+    ON k.table_schema = t.table_schema
+    AND k.table_name = t.table_name
+    AND k.constraint_name = 'PRIMARY'
+    AND k.column_name = 'id'
+WHERE t.table_schema = DATABASE()
+AND t.table_name IN ('users', 'sales', 'supplier', 'po_items')
+AND k.column_name IS NULL;
@@ -0,0 +1,70 @@
+-- Precomputed tables for the customer overview and aging reports.
+-- Run once against the application database:
+--   mysql -u root -p wholesale < migrations/002_customer_report_views.sql
+-- The refresh event needs the scheduler on: SET GLOBAL event_scheduler = ON;
+-- CustomerReportService falls back to the live queries whenever these are
+-- missing or older than settings.report_view_max_age_seconds.
+
+CREATE TABLE IF NOT EXISTS mv_customer_overview (
+    id TINYINT NOT NULL PRIMARY KEY,
+    total_customers INT NOT NULL,
+    new_customers_last_30_days INT NOT NULL,
+    active_customers INT NOT NULL,
+    inactive_customers INT NOT NULL,
+    customers_with_outstanding_balance INT NOT NULL,
+    refreshed_at DATETIME NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS mv_customer_aging (
+    row_id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    id INT NOT NULL,
+    companyid INT,
+    name VARCHAR(255),
+    currency VARCHAR(16),
+    `current` DECIMAL(15, 2),
+    sd0 DECIMAL(15, 2),
+    sd1 DECIMAL(15, 2),
+    sd2 DECIMAL(15, 2),
+    sd3 DECIMAL(15, 2),
+    Total DECIMAL(15, 2),
+    refreshed_at DATETIME NOT NULL,
+    INDEX idx_mv_customer_aging_name (name)
+);
+
+DELIMITER //
+
+CREATE PROCEDURE refresh_customer_report_views()
+BEGIN
+    REPLACE INTO mv_customer_overview
+    SELECT
+        1,
+        COUNT(*),
+        COALESCE(SUM(startdate >= NOW() - INTERVAL 30 DAY), 0),
+        COALESCE(SUM(lastserved >= NOW() - INTERVAL 60 DAY), 0),
+        COALESCE(SUM(lastserved < NOW() - INTERVAL 60 DAY), 0),
+        COALESCE(SUM(bal > 0), 0),
+        NOW()
+    FROM customers;
+
+    START TRANSACTION;
+    DELETE FROM mv_customer_aging;
+    INSERT INTO mv_customer_aging
+        (id, companyid, name, currency, `current`, sd0, sd1, sd2, sd3, Total, refreshed_at)
+    SELECT
+        c.id, c.companyid, c.name, u.symbol,
+        a.scurrent, a.d1, a.d2, a.d3, a.d4, a.stotal,
+        NOW()
+    FROM aging a
+    INNER JOIN customers c ON a.customercode = c.id
+    INNER JOIN cust_type t ON c.cust_type = t.type_id
+    INNER JOIN currency u ON c.currency_id = u.currency_id;
+    COMMIT;
+END //
+
+DELIMITER ;
+
+CREATE EVENT IF NOT EXISTS ev_refresh_customer_report_views
+    ON SCHEDULE EVERY 1 HOUR
+    DO CALL refresh_customer_report_views();
+
+CALL refresh_customer_report_views();
@@ -0,0 +1,9 @@
+-- Indexes backing the dead stock report's NOT EXISTS probe.
+-- Run once against the application database:
+--   mysql -u root -p wholesale < migrations/003_dead_stock_indexes.sql
+
+-- Per item, find its sale lines without touching the row data
+CREATE INDEX idx_sales_items_item_sale ON sales_items (item_id, sale_id);
+
+-- Resolve each sale line's date from the index alone
+CREATE INDEX idx_sales_date_id ON sales (date, id);
@@ -0,0 +1,6 @@
+-- Index backing the sales reports' type IN ('10', '14') filter over a date range.
+-- Run once against the application database:
+--   mysql -u root -p wholesale < migrations/004_sales_type_date_index.sql
+
+-- Two equality prefixes on type, each followed by a range seek on date
+CREATE INDEX idx_sales_type_date ON sales (type, date);
@@ -0,0 +1,5 @@
+-- Index backing the incoming/outgoing stock reports' tyme range.
+-- Run once against the application database:
+--   mysql -u root -p wholesale < migrations/005_stockmoves_tyme_index.sql
+
+CREATE INDEX idx_stockmoves_tyme ON stockmoves (tyme);
@@ -0,0 +1,85 @@
+-- Per item and location stock rollup read by the stock levels and dead stock
+-- reports, kept current by triggers on stockmoves.
+-- Run once against the application database before deploying the reports
+-- that read it:
+--   mysql -u root -p wholesale < migrations/006_stock_by_item_loc.sql
+
+CREATE TABLE IF NOT EXISTS stock_by_item_loc (
+    stockid INT NOT NULL,
+    loccode VARCHAR(20) NOT NULL,
+    qty_sum DECIMAL(20, 4) NOT NULL DEFAULT 0,
+    last_tyme DATETIME NULL,
+    -- Receipts only (qty > 0), as the dead stock report counts them
+    in_qty_sum DECIMAL(20, 4) NOT NULL DEFAULT 0,
+    last_in_tyme DATETIME NULL,
+    PRIMARY KEY (stockid, loccode)
+);
+
+-- Lets the triggers recompute one (item, location) from an index range
+CREATE INDEX idx_stockmoves_stock_loc_tyme ON stockmoves (stockid, loccode, tyme);
+
+DELIMITER //
+
+CREATE PROCEDURE refresh_stock_by_item_loc(IN p_stockid INT, IN p_loccode VARCHAR(20))
+BEGIN
+    DELETE FROM stock_by_item_loc WHERE stockid = p_stockid AND loccode = p_loccode;
+    INSERT INTO stock_by_item_loc (stockid, loccode, qty_sum, last_tyme, in_qty_sum, last_in_tyme)
+    SELECT
+        stockid, loccode,
+        SUM(qty), MAX(tyme),
+        COALESCE(SUM(CASE WHEN qty > 0 THEN qty END), 0),
+        MAX(CASE WHEN qty > 0 THEN tyme END)
+    FROM stockmoves
+    WHERE stockid = p_stockid AND loccode = p_loccode
+    GROUP BY stockid, loccode;
+END //
+
+-- Inserts are the common case and are applied incrementally
+CREATE TRIGGER trg_stockmoves_rollup_insert AFTER INSERT ON stockmoves
+FOR EACH ROW
+BEGIN
+    INSERT INTO stock_by_item_loc (stockid, loccode, qty_sum, last_tyme, in_qty_sum, last_in_tyme)
+    VALUES (
+        NEW.stockid, NEW.loccode, NEW.qty, NEW.tyme,
+        IF(NEW.qty > 0, NEW.qty, 0), IF(NEW.qty > 0, NEW.tyme, NULL)
+    )
+    ON DUPLICATE KEY UPDATE
+        qty_sum = qty_sum + NEW.qty,
+        -- GREATEST returns NULL if either side is; skip NULLs as MAX() does
+        last_tyme = GREATEST(COALESCE(last_tyme, NEW.tyme), COALESCE(NEW.tyme, last_tyme)),
+        in_qty_sum = in_qty_sum + IF(NEW.qty > 0, NEW.qty, 0),
+        last_in_tyme = IF(
+            NEW.qty > 0,
+            GREATEST(COALESCE(last_in_tyme, NEW.tyme), COALESCE(NEW.tyme, last_in_tyme)),
+            last_in_tyme
+        );
+END //
+
+-- A removed or edited move may have been the latest one, so recompute the
+-- affected keys instead of adjusting them
+CREATE TRIGGER trg_stockmoves_rollup_update AFTER UPDATE ON stockmoves
+FOR EACH ROW
+BEGIN
+    CALL refresh_stock_by_item_loc(OLD.stockid, OLD.loccode);
+    IF NEW.stockid <> OLD.stockid OR NEW.loccode <> OLD.loccode THEN
+        CALL refresh_stock_by_item_loc(NEW.stockid, NEW.loccode);
+    END IF;
+END //
+
+CREATE TRIGGER trg_stockmoves_rollup_delete AFTER DELETE ON stockmoves
+FOR EACH ROW
+BEGIN
+    CALL refresh_stock_by_item_loc(OLD.stockid, OLD.loccode);
+END //
+
+DELIMITER ;
+
+-- Initial backfill
+REPLACE INTO stock_by_item_loc (stockid, loccode, qty_sum, last_tyme, in_qty_sum, last_in_tyme)
+SELECT
+    stockid, loccode,
+    SUM(qty), MAX(tyme),
+    COALESCE(SUM(CASE WHEN qty > 0 THEN qty END), 0),
+    MAX(CASE WHEN qty > 0 THEN tyme END)
+FROM stockmoves
+GROUP BY stockid, loccode;
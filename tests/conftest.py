@@ -5,10 +5,11 @@ import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Test client fixture"""
-    return TestClient(app)
+    """Test client fixture shared by the whole session; startup and shutdown run once"""
+    with TestClient(app) as c:
+        yield c
 
 @pytest.fixture
 def sample_sales_request():
@@ -0,0 +1,73 @@
+"""
+Test cases for the query result cache
+"""
+from datetime import date
+
+from app.cache import MISS, QueryCache, invalidate_ttl_cached, referenced_tables, ttl_cached
+
+def test_referenced_tables():
+    """Tables are collected from FROM/JOIN and write clauses"""
+    sql = "SELECT * FROM sales s JOIN currency c ON s.currency_id = c.currency_id"
+    assert referenced_tables(sql) == {"sales", "currency"}
+    assert referenced_tables("UPDATE users SET password_hash = %s") == {"users"}
+
+def test_write_invalidates_only_matching_tables():
+    """A write drops cached reads of the same table and keeps the rest"""
+    cache = QueryCache(maxsize=16, ttl=60)
+    users_key = cache.make_key("all", "SELECT id FROM users", None)
+    sales_key = cache.make_key("all", "SELECT id FROM sales", None)
+    cache.set(users_key, "SELECT id FROM users", [{"id": 1}])
+    cache.set(sales_key, "SELECT id FROM sales", [{"id": 2}])
+    
+    cache.invalidate("UPDATE users SET password_hash = %s WHERE id = %s")
+    
+    assert cache.get(users_key) is MISS
+    assert cache.get(sales_key) == [{"id": 2}]
+
+def test_key_distinguishes_params_and_kind():
+    """Different params or result kinds never share a key"""
+    sql = "SELECT * FROM users WHERE id = %s"
+    assert QueryCache.make_key("all", sql, (1,)) != QueryCache.make_key("all", sql, (2,))
+    assert QueryCache.make_key("all", sql, (1,)) != QueryCache.make_key("one", sql, (1,))
+
+def test_ttl_cached_reuses_results_until_a_write():
+    """Repeat calls are served from cache until a write touches a dependent table"""
+    calls = []
+    
+    @ttl_cached(ttl=60, tables=("customers",))
+    def report(day):
+        calls.append(day)
+        return len(calls)
+    
+    assert report(date(2024, 1, 1)) == report(date(2024, 1, 1)) == 1
+    invalidate_ttl_cached("UPDATE sales SET paid = 0")
+    assert report(date(2024, 1, 1)) == 1
+    invalidate_ttl_cached("UPDATE customers SET bal = 0")
+    assert report(date(2024, 1, 1)) == 2
+
+def test_large_results_are_not_cached(monkeypatch):
+    """Results above query_cache_max_rows are returned but never stored"""
+    from contextlib import contextmanager
+
+    from app import database_v2
+    from app.config import settings
+
+    executed = []
+
+    class FakeCursor:
+        def execute(self, query, params):
+            executed.append(query)
+
+        def fetchall(self):
+            return [{"id": i} for i in range(3)]
+
+    @contextmanager
+    def fake_cursor(**kwargs):
+        yield FakeCursor()
+
+    monkeypatch.setattr(database_v2, "get_db_cursor", fake_cursor)
+    monkeypatch.setattr(settings, "query_cache_max_rows", 2)
+    sql = "SELECT id FROM cache_row_limit_test"
+    database_v2.execute_query(sql)
+    database_v2.execute_query(sql)
+    assert len(executed) == 2
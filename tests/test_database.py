@@ -0,0 +1,176 @@
+"""
+Test cases for the database layers, run against fake pools and cursors
+"""
+import asyncio
+
+import pytest
+
+from app.database_v2 import CircuitBreaker, _prepared_cursor
+from app.exceptions import ServiceUnavailableError
+
+def test_breaker_opens_after_threshold_and_recovers():
+    """The breaker opens at the threshold and closes after a successful trial call"""
+    breaker = CircuitBreaker(threshold=2, reset_seconds=60)
+    breaker.check()
+    breaker.record_failure()
+    breaker.check()
+    breaker.record_failure()
+    with pytest.raises(ServiceUnavailableError):
+        breaker.check()
+    
+    breaker.reset_seconds = 0
+    breaker.check()
+    breaker.record_success()
+    breaker.reset_seconds = 60
+    breaker.check()
+
+class _FakeCursor:
+    def close(self):
+        pass
+
+class _FakeConnection:
+    def cursor(self, **kwargs):
+        assert kwargs == {"prepared": True, "dictionary": True}
+        return _FakeCursor()
+
+def test_prepared_cursor_is_reused_per_statement():
+    """Each statement gets one prepared cursor per connection"""
+    conn = _FakeConnection()
+    first = _prepared_cursor(conn, "SELECT 1")
+    assert _prepared_cursor(conn, "SELECT 1") is first
+    assert _prepared_cursor(conn, "SELECT 2") is not first
+
+def test_prepared_cursors_are_dropped_after_reconnect():
+    """A new server connection id discards the cached cursors"""
+    conn = _FakeConnection()
+    conn.connection_id = 7
+    first = _prepared_cursor(conn, "SELECT 1")
+    conn.connection_id = 8
+    assert _prepared_cursor(conn, "SELECT 1") is not first
+
+def test_batch_loader_coalesces_concurrent_loads(monkeypatch):
+    """Concurrent loads share one IN query and missing ids resolve to None"""
+    from app import loaders
+    
+    calls = []
+    
+    async def fake_execute_query(conn, query, params=None, use_cache=True):
+        calls.append(params)
+        return [{"id": key} for key in params if key != 3]
+    
+    class FakePool:
+        async def acquire(self):
+            return None
+        
+        def release(self, conn):
+            pass
+    
+    monkeypatch.setattr(loaders, "execute_query", fake_execute_query)
+    loader = loaders.BatchLoader(FakePool(), "SELECT id FROM t WHERE id IN ({ids})", 0)
+    
+    async def load_all():
+        return await asyncio.gather(*(loader.load(key) for key in (1, 2, 2, 3)))
+    
+    assert asyncio.run(load_all()) == [{"id": 1}, {"id": 2}, {"id": 2}, None]
+    assert calls == [(1, 2, 3)]
+
+def test_get_db_connection_waits_for_a_free_connection(monkeypatch):
+    """An exhausted pool is retried until a connection is returned"""
+    from mysql.connector.errors import PoolError
+    
+    from app import database_v2
+    
+    class BusyPool:
+        attempts = 0
+        
+        def get_connection(self):
+            self.attempts += 1
+            if self.attempts < 3:
+                raise PoolError("Failed getting connection; pool exhausted")
+            return "conn"
+    
+    pool = BusyPool()
+    monkeypatch.setattr(database_v2, "get_connection_pool", lambda: pool)
+    assert database_v2.get_db_connection() == "conn"
+    assert pool.attempts == 3
+
+def test_breaker_ignores_query_errors(monkeypatch):
+    """Only connection-level errors count towards opening the breaker"""
+    from mysql.connector.errors import OperationalError, ProgrammingError
+    
+    from app import database_v2
+    from app.exceptions import DatabaseError
+    
+    class FakeConnection:
+        def cursor(self, **kwargs):
+            return _FakeCursor()
+        
+        def rollback(self):
+            pass
+        
+        def close(self):
+            pass
+    
+    breaker = CircuitBreaker(threshold=1, reset_seconds=60)
+    monkeypatch.setattr(database_v2, "db_breaker", breaker)
+    monkeypatch.setattr(database_v2, "get_db_connection", FakeConnection)
+    
+    with pytest.raises(DatabaseError):
+        with database_v2.get_db_cursor():
+            raise ProgrammingError("Table 'wholesale.mv_customer_aging' doesn't exist", errno=1146)
+    breaker.check()
+    
+    with pytest.raises(DatabaseError):
+        with database_v2.get_db_cursor():
+            raise OperationalError("Lost connection to MySQL server during query", errno=2013)
+    with pytest.raises(ServiceUnavailableError):
+        breaker.check()
+
+def test_async_acquire_gives_up_after_pool_timeout(monkeypatch):
+    """Waiting past mysql_pool_timeout raises and records a failure"""
+    from app import database_async
+    from app.config import settings
+    from app.exceptions import DatabaseError
+    
+    class ExhaustedPool:
+        async def acquire(self):
+            await asyncio.sleep(60)
+    
+    breaker = CircuitBreaker(threshold=5, reset_seconds=60)
+    monkeypatch.setattr(database_async, "db_breaker", breaker)
+    monkeypatch.setattr(settings, "mysql_pool_timeout", 0.01)
+    
+    async def checkout():
+        async with database_async.acquire(ExhaustedPool()):
+            pass
+    
+    with pytest.raises(DatabaseError):
+        asyncio.run(checkout())
+    assert breaker._failures == 1
+
+def test_execute_stream_lifts_execution_cap_for_its_checkout(monkeypatch):
+    """Streams lift max_execution_time and restore it afterwards"""
+    from contextlib import contextmanager
+    
+    from app import database_v2
+    
+    executed = []
+    
+    class StreamCursor:
+        def execute(self, query, params=None):
+            executed.append(query)
+        
+        def fetchmany(self, size):
+            return []
+    
+    @contextmanager
+    def fake_cursor(**kwargs):
+        yield StreamCursor()
+    
+    monkeypatch.setattr(database_v2, "get_db_cursor", fake_cursor)
+    assert list(database_v2.execute_stream("SELECT id FROM users")) == []
+    assert executed == [
+        database_v2.execution_time_sql(0),
+        "SELECT id FROM users",
+        database_v2.execution_time_sql(database_v2.settings.mysql_max_execution_time_ms),
+    ]
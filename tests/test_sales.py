@@ -7,7 +7,7 @@ from fastapi.testclient import TestClient
 def test_sales_report_today_hourly(client: TestClient):
     """Test today hourly sales report"""
     response = client.post(
-        "/api/reports/sales",
+        "/api/v1/reports/sales",
         json={"category": "today_hourly"}
     )
     assert response.status_code in [200, 500]  # 500 if no DB connection
@@ -15,8 +15,22 @@ def test_sales_report_today_hourly(client: TestClient):
 def test_sales_report_invalid_category(client: TestClient):
     """Test invalid category handling"""
     response = client.post(
-        "/api/reports/sales",
+        "/api/v1/reports/sales",
         json={"category": "invalid_category"}
     )
     # Should still process as default sales
     assert response.status_code in [200, 500]
+
+def test_sales_report_decimals_are_json_numbers(client: TestClient, monkeypatch):
+    """Decimal columns come back as numbers, matching the NDJSON stream"""
+    from decimal import Decimal
+    from app.services.sales_service import SalesReportService
+    
+    monkeypatch.setattr(
+        SalesReportService, "get_rep_sales",
+        staticmethod(lambda from_date, to_date: [{"username": "amy", "total_sales": Decimal("12.50")}])
+    )
+    response = client.post("/api/v1/reports/sales", json={"category": "rep"})
+    assert response.status_code == 200
+    assert response.json()["data"] == [{"username": "amy", "total_sales": 12.5}]
+    assert '"total_sales":12.5' in response.text
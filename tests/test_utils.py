@@ -0,0 +1,49 @@
+"""
+Test cases for utility helpers
+"""
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+
+from app.utils import DateHelper, dumps, ndjson_response
+
+def _range_on(today: date, period: str):
+    with mock.patch("app.utils.date") as fake_date:
+        fake_date.today.return_value = today
+        fake_date.fromordinal = date.fromordinal
+        return DateHelper.get_date_range(period)
+
+def test_yesterday_on_first_of_month():
+    """Yesterday rolls back across month and year boundaries"""
+    assert _range_on(date(2024, 3, 1), "yesterday") == (date(2024, 2, 29), date(2024, 2, 29))
+    assert _range_on(date(2024, 1, 1), "yesterday") == (date(2023, 12, 31), date(2023, 12, 31))
+
+def test_last_month_in_january():
+    """Last month in January is the previous December"""
+    assert _range_on(date(2024, 1, 15), "last_month") == (date(2023, 12, 1), date(2023, 12, 31))
+
+def test_dumps_encodes_mysql_row_types():
+    """Dates stay ISO strings and Decimals become JSON numbers"""
+    row = {"day": date(2024, 1, 2), "at": datetime(2024, 1, 2, 3, 4), "total": Decimal("1.50"), 1: "x"}
+    assert dumps(row) == b'{"day":"2024-01-02","at":"2024-01-02T03:04:00","total":1.5,"1":"x"}'
+
+def test_ndjson_response_raises_before_streaming():
+    """A query that fails on its first batch raises instead of sending a 200"""
+    def failing():
+        raise RuntimeError("Table 'wholesale.stockmoves' doesn't exist")
+        yield []
+    
+    with pytest.raises(RuntimeError):
+        ndjson_response(failing())
+
+def test_ndjson_response_streams_every_batch():
+    """The prefetched first batch is sent ahead of the rest"""
+    response = ndjson_response(iter([[{"id": 1}], [{"id": 2}, {"id": 3}]]))
+    
+    async def body():
+        return b"".join([chunk async for chunk in response.body_iterator])
+    
+    assert asyncio.run(body()) == b'{"id":1}\n{"id":2}\n{"id":3}\n'